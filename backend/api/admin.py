@@ -0,0 +1,45 @@
+from django.contrib import admin
+
+from .models import SlowQuery
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    """Slow query admin model, read only."""
+
+    list_display = (
+        'created',
+        'duration',
+        'view',
+        'action',
+        'path',
+        'explained',
+    )
+    list_filter = (
+        'view',
+        'action',
+    )
+    search_fields = (
+        'sql',
+        'path',
+    )
+    readonly_fields = (
+        'created',
+        'duration',
+        'view',
+        'action',
+        'path',
+        'sql',
+        'params',
+        'plan',
+    )
+
+    @admin.display(description='План', boolean=True)
+    def explained(self, obj):
+        return bool(obj.plan)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from api import metrics
+
+User = get_user_model()
+
+CACHE_KEY = 'auth-token:{}'
+# User fields kept in cache, other fields are loaded on access.
+USER_FIELDS = (
+    'id',
+    'email',
+    'username',
+    'first_name',
+    'last_name',
+    'is_active',
+    'is_staff',
+    'is_superuser',
+)
+
+
+class TokenCache:
+    """
+    Token key to (user, token) cache.
+
+    With `TOKEN_CACHE_ALIAS` setting shared Django cache is used, so
+    invalidation is seen by all workers at once. Otherwise per-worker
+    LRU with `TOKEN_CACHE_SIZE` items and `TOKEN_CACHE_TTL` seconds
+    lifetime is used, then other workers drop invalidated entries not
+    later than in `TOKEN_CACHE_TTL` seconds.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+
+    @property
+    def shared(self):
+        if settings.TOKEN_CACHE_ALIAS is None:
+            return None
+        return caches[settings.TOKEN_CACHE_ALIAS]
+
+    def get(self, key):
+        if self.shared is not None:
+            return self.shared.get(CACHE_KEY.format(key))
+        now = time.monotonic()
+        with self.lock:
+            item = self.items.get(key)
+            if item is not None:
+                expires, value = item
+                if expires > now:
+                    self.items.move_to_end(key)
+                    return value
+                del self.items[key]
+        return None
+
+    def set_local(self, key, value):
+        with self.lock:
+            self.items[key] = (time.monotonic() + settings.TOKEN_CACHE_TTL,
+                               value)
+            self.items.move_to_end(key)
+            while len(self.items) > settings.TOKEN_CACHE_SIZE:
+                self.items.popitem(last=False)
+
+    def set(self, key, value):
+        if self.shared is not None:
+            self.shared.set(
+                CACHE_KEY.format(key), value, settings.TOKEN_CACHE_TTL
+            )
+        else:
+            self.set_local(key, value)
+
+    def delete(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete(CACHE_KEY.format(key))
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication with cached token lookups.
+
+    Cache keeps only `USER_FIELDS` values and token creation time, every
+    request gets new user with other fields deferred. Saving such user
+    writes only loaded or changed fields, so cached values don't
+    overwrite counters or password changed by other requests.
+    """
+
+    # `from_db` expects deferred instance values in model fields order.
+    user_fields = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in USER_FIELDS
+    ]
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            metrics.inc(
+                'foodgram_cache_requests_total', cache='token', result='miss'
+            )
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, (
+                [getattr(user, field) for field in self.user_fields],
+                token.created,
+            ))
+            return user, token
+        metrics.inc(
+            'foodgram_cache_requests_total', cache='token', result='hit'
+        )
+        values, created = cached
+        user = User.from_db(
+            router.db_for_read(User), self.user_fields, values
+        )
+        token = Token(key=key, user=user, created=created)
+        token._state.adding = False
+        token._state.db = router.db_for_read(Token)
+        return user, token
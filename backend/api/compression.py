@@ -0,0 +1,97 @@
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ACCEPT_ENCODING_REGEX = re.compile(
+    r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*(?:,|$)'
+)
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'text/',
+)
+
+
+def available_encodings():
+    """Return supported content encodings in preference order."""
+    return ('br', 'gzip') if brotli else ('gzip',)
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.BROTLI_QUALITY)
+    return gzip.compress(
+        content, compresslevel=settings.GZIP_LEVEL, mtime=0
+    )
+
+
+def compress_all(content):
+    """
+    Return dictionary with content compressed by all supported encodings.
+
+    Empty dictionary is returned for content shorter than
+    `COMPRESSION_MIN_SIZE`.
+    """
+    if len(content) < settings.COMPRESSION_MIN_SIZE:
+        return {}
+    return {
+        encoding: compress(content, encoding)
+        for encoding in available_encodings()
+    }
+
+
+def accepted_encoding(request):
+    """Return preferred supported encoding from Accept-Encoding header."""
+    accepted = {}
+    for name, quality in ACCEPT_ENCODING_REGEX.findall(
+        request.META.get('HTTP_ACCEPT_ENCODING', '')
+    ):
+        try:
+            accepted[name.lower()] = float(quality) if quality else 1.0
+        except ValueError:
+            continue
+    for encoding in available_encodings():
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def compress_response(request, response):
+    """
+    Compress response content with encoding accepted by client.
+
+    Only not streaming responses with JSON or text content not shorter
+    than `COMPRESSION_MIN_SIZE` are compressed. Response `precompressed`
+    attribute (encoding to bytes dictionary) is used instead of
+    compression when it has accepted encoding.
+    """
+    if (response.streaming
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith(
+                COMPRESSIBLE_TYPES
+            )
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE):
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoding = accepted_encoding(request)
+    if encoding is None:
+        return response
+    precompressed = getattr(response, 'precompressed', None) or {}
+    content = precompressed.get(encoding)
+    if content is None:
+        content = compress(response.content, encoding)
+    if len(content) >= len(response.content):
+        return response
+    response.content = content
+    response['Content-Length'] = str(len(content))
+    response['Content-Encoding'] = encoding
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    return response
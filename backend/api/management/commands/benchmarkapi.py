@@ -0,0 +1,504 @@
+import base64
+import io
+import json
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client, TestCase, override_settings
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from api.utils import percentile
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+
+User = get_user_model()
+
+DEFAULT_BASELINE = settings.BASE_DIR / 'benchmark_baseline.json'
+PERCENTILES = (50, 90, 99)
+PASSWORD = 'benchmark-password'
+
+
+def recipe_data(context):
+    return {
+        'ingredients': [
+            {'id': context['ingredient_id'], 'amount': 10},
+        ],
+        'tags': [context['tag_id']],
+        'image': context['image'],
+        'name': 'Рецепт для замеров',
+        'text': 'Описание рецепта для замеров',
+        'cooking_time': 10,
+    }
+
+
+def user_data(context):
+    context['created_users'] += 1
+    number = context['created_users']
+    return {
+        'email': f'benchmark-{number}@example.com',
+        'username': f'benchmark-{number}',
+        'first_name': 'Бенчмарк',
+        'last_name': 'Бенчмарк',
+        'password': PASSWORD,
+    }
+
+
+def login_data(context):
+    return {
+        'email': context['login_email'],
+        'password': PASSWORD,
+    }
+
+
+@dataclass
+class Case:
+    """
+    Benchmarked API request.
+
+    `path` is formatted with benchmark context, `data` builds request
+    body from context and `save` stores response values in context for
+    the next cases.
+    """
+
+    name: str
+    path: str
+    method: str = 'get'
+    auth: Optional[str] = 'user'
+    data: Optional[Callable] = None
+    status: int = 200
+    save: Optional[Callable] = None
+
+
+CASES = (
+    Case('tags-list', '/api/tags/'),
+    Case('tags-detail', '/api/tags/{tag_id}/'),
+    Case('ingredients-list', '/api/ingredients/'),
+    Case(
+        'ingredients-search',
+        '/api/ingredients/?name={ingredient_prefix}'
+    ),
+    Case('ingredients-detail', '/api/ingredients/{ingredient_id}/'),
+    Case('recipes-list-anonymous', '/api/recipes/', auth=None),
+    Case('recipes-list', '/api/recipes/'),
+    Case('recipes-list-limit', '/api/recipes/?limit=50'),
+    Case(
+        'recipes-list-sparse',
+        '/api/recipes/?limit=50&fields=id,name,image,cooking_time'
+    ),
+    Case(
+        'recipes-filter-tags',
+        '/api/recipes/?tags={tag_slug}&tags={second_tag_slug}'
+    ),
+    Case('recipes-filter-author', '/api/recipes/?author={author_id}'),
+    Case('recipes-filter-favorited', '/api/recipes/?is_favorited=1'),
+    Case('recipes-filter-not-favorited', '/api/recipes/?is_favorited=0'),
+    Case(
+        'recipes-filter-shopping-cart',
+        '/api/recipes/?is_in_shopping_cart=1'
+    ),
+    Case('recipes-search', '/api/recipes/?search={search_word}'),
+    Case(
+        'recipes-filter-ingredients',
+        '/api/recipes/?ingredients={recipe_ingredient_ids}'
+    ),
+    Case(
+        'recipes-filter-exclude-ingredients',
+        '/api/recipes/?exclude_ingredients={recipe_ingredient_ids}'
+    ),
+    Case('recipes-order-popularity', '/api/recipes/?ordering=popularity'),
+    Case(
+        'recipes-filter-cooking-time',
+        '/api/recipes/?cooking_time_min=10&cooking_time_max=30'
+    ),
+    Case('recipes-keyset', '/api/recipes/?ordering=popularity&cursor='),
+    Case('recipes-detail', '/api/recipes/{recipe_id}/'),
+    Case('recipes-similar', '/api/recipes/{recipe_id}/similar/'),
+    Case('recipes-batch', '/api/recipes/batch/?ids={batch_recipe_ids}'),
+    Case('recipes-feed', '/api/recipes/feed/'),
+    Case('recipes-trending', '/api/recipes/trending/'),
+    Case(
+        'recipes-create',
+        '/api/recipes/',
+        method='post',
+        data=recipe_data,
+        status=201,
+        save=lambda context, data: context.update(
+            created_recipe_id=data['id']
+        )
+    ),
+    Case(
+        'recipes-update',
+        '/api/recipes/{created_recipe_id}/',
+        method='patch',
+        data=recipe_data
+    ),
+    Case(
+        'recipes-delete',
+        '/api/recipes/{created_recipe_id}/',
+        method='delete',
+        status=204
+    ),
+    Case(
+        'favorite-add',
+        '/api/recipes/{free_recipe_id}/favorite/',
+        method='post',
+        status=201
+    ),
+    Case(
+        'favorite-remove',
+        '/api/recipes/{free_recipe_id}/favorite/',
+        method='delete',
+        status=204
+    ),
+    Case(
+        'shopping-cart-add',
+        '/api/recipes/{free_recipe_id}/shopping_cart/',
+        method='post',
+        status=201
+    ),
+    Case(
+        'shopping-cart-remove',
+        '/api/recipes/{free_recipe_id}/shopping_cart/',
+        method='delete',
+        status=204
+    ),
+    Case('shopping-cart-download', '/api/recipes/download_shopping_cart/'),
+    Case('users-list-anonymous', '/api/users/', auth=None),
+    Case('users-list', '/api/users/'),
+    Case('users-detail', '/api/users/{author_id}/'),
+    Case('users-me', '/api/users/me/'),
+    Case('users-subscriptions', '/api/users/subscriptions/'),
+    Case(
+        'users-subscriptions-recipes-limit',
+        '/api/users/subscriptions/?recipes_limit=3'
+    ),
+    Case(
+        'users-subscribe',
+        '/api/users/{free_author_id}/subscribe/',
+        method='post',
+        status=201
+    ),
+    Case(
+        'users-unsubscribe',
+        '/api/users/{free_author_id}/subscribe/',
+        method='delete',
+        status=204
+    ),
+    Case(
+        'users-create',
+        '/api/users/',
+        method='post',
+        auth=None,
+        data=user_data,
+        status=201
+    ),
+    Case(
+        'auth-login',
+        '/api/auth/token/login/',
+        method='post',
+        auth=None,
+        data=login_data,
+        save=lambda context, data: context.update(
+            login_token=data['auth_token']
+        )
+    ),
+    Case(
+        'auth-logout',
+        '/api/auth/token/logout/',
+        method='post',
+        auth='login',
+        status=204
+    ),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время ответа и количество SQL запросов эндпоинтов API '
+        'и сравнивает их с сохраненными базовыми значениями'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Количество замеров каждого запроса.'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=2,
+            help='Количество прогревочных запросов без замеров.'
+        )
+        parser.add_argument(
+            '--only',
+            nargs='*',
+            default=(),
+            help='Замерять только запросы, имена которых начинаются '
+                 'с указанных префиксов.'
+        )
+        parser.add_argument(
+            '--baseline',
+            default=DEFAULT_BASELINE,
+            help='Файл с базовыми значениями.'
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Сохранить результаты как базовые значения.'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Допустимое относительное увеличение p90 времени ответа.'
+        )
+        parser.add_argument(
+            '--min-delta',
+            type=float,
+            default=2.0,
+            help='Допустимое абсолютное увеличение p90 времени ответа, мс.'
+        )
+        parser.add_argument(
+            '--query-threshold',
+            type=int,
+            default=0,
+            help='Допустимое увеличение количества SQL запросов.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError('Wrong number of iterations')
+        cases = [
+            case for case in CASES
+            if not options['only']
+            or case.name.startswith(tuple(options['only']))
+        ]
+        setup_test_environment(debug=False)
+        try:
+            with tempfile.TemporaryDirectory() as media_root:
+                with override_settings(
+                    MEDIA_ROOT=media_root,
+                    PRIVATE_MEDIA_ROOT=media_root
+                ):
+                    results = self.run_benchmark(cases, options)
+        finally:
+            teardown_test_environment()
+        baseline = self.load_baseline(options['baseline'])
+        regressions = self.report(results, baseline, options)
+        if options['save_baseline']:
+            with open(options['baseline'], 'w') as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+            self.stdout.write(f'Baseline saved to {options["baseline"]}')
+        elif regressions:
+            raise CommandError(
+                'Performance regressions: ' + ', '.join(regressions)
+            )
+
+    def load_baseline(self, path):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Wrong baseline file: {error}')
+
+    def run_benchmark(self, cases, options):
+        """
+        Run cases in transaction rolled back after benchmark.
+
+        Transaction is never committed, so `on_commit` callbacks of every
+        request (feed fan-out, cache invalidation) are run by `request`.
+        """
+        with transaction.atomic():
+            context = self.get_context()
+            results = self.run_cases(cases, context, options)
+            transaction.set_rollback(True)
+        return results
+
+    def get_context(self):
+        """Choose benchmark user and objects used in requests."""
+        user = User.objects.annotate(
+            subscriptions_count=Count('subscriptions')
+        ).order_by('-subscriptions_count', 'pk').first()
+        recipe = Recipe.objects.order_by('-favorites_count', 'pk').first()
+        tags = list(Tag.objects.values_list('pk', 'slug')[:2])
+        ingredient = Ingredient.objects.first()
+        if None in (user, recipe, ingredient) or not tags:
+            raise CommandError(
+                'Database is empty, fill it with generatedata command'
+            )
+        free_recipe = Recipe.objects.exclude(
+            favorings__user=user
+        ).exclude(
+            shoppingusers__user=user
+        ).first()
+        free_author = User.objects.exclude(
+            pk=user.pk
+        ).exclude(
+            subscribers__user=user
+        ).first()
+        if free_recipe is None or free_author is None:
+            raise CommandError('Not enough recipes or users for benchmark')
+        if not user.shoppingcart.exists():
+            ShoppingCart.objects.create(user=user, recipe=recipe)
+        if not user.favorites.exists():
+            Favorite.objects.create(user=user, recipe=recipe)
+        login_user = User.objects.create_user(
+            username='benchmark-login',
+            email='benchmark-login@example.com',
+            password=PASSWORD,
+        )
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8)).save(buffer, 'PNG')
+        return {
+            'user_token': Token.objects.get_or_create(user=user)[0].key,
+            'author_id': recipe.author_id,
+            'recipe_id': recipe.pk,
+            'free_recipe_id': free_recipe.pk,
+            'free_author_id': free_author.pk,
+            'tag_id': tags[0][0],
+            'tag_slug': tags[0][1],
+            'second_tag_slug': tags[-1][1],
+            'ingredient_id': ingredient.pk,
+            'ingredient_prefix': ingredient.name[:1],
+            'recipe_ingredient_ids': ','.join(
+                str(pk) for pk in recipe.ingredients.values_list(
+                    'pk', flat=True
+                )[:2]
+            ),
+            'batch_recipe_ids': ','.join(
+                str(pk) for pk in Recipe.objects.values_list(
+                    'pk', flat=True
+                )[:50]
+            ),
+            'search_word': recipe.name.split()[0],
+            'login_email': login_user.email,
+            'created_users': 0,
+            'image': 'data:image/png;base64,'
+                     + base64.b64encode(buffer.getvalue()).decode(),
+        }
+
+    def request(self, client, case, context):
+        """
+        Make case request and return its time in milliseconds.
+
+        Caches are cleared before request, so endpoint is measured
+        instead of cached response. `on_commit` callbacks registered by
+        request are run and measured with it.
+        """
+        for cache in caches.all():
+            cache.clear()
+        headers = {}
+        if case.auth is not None:
+            headers['HTTP_AUTHORIZATION'] = (
+                f'Token {context[case.auth + "_token"]}'
+            )
+        data = case.data(context) if case.data else None
+        started = time.perf_counter()
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            response = getattr(client, case.method)(
+                case.path.format(**context),
+                data=json.dumps(data) if data is not None else None,
+                content_type='application/json',
+                **headers
+            )
+            if response.streaming:
+                b''.join(response.streaming_content)
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != case.status:
+            raise CommandError(
+                f'{case.name}: expected status {case.status}, got '
+                f'{response.status_code}: {response.content[:200]!r}'
+            )
+        if case.save is not None:
+            case.save(context, response.json())
+        return elapsed
+
+    def run_cases(self, cases, context, options):
+        """
+        Run all cases one after another on every iteration.
+
+        Cases keep database state: objects added by one case are removed
+        by the next one. Queries are counted on a separate iteration
+        after warmup, so counting doesn't affect measured time.
+        """
+        client = Client()
+        timings = {case.name: [] for case in cases}
+        queries = {}
+        total = options['warmup'] + 1 + options['iterations']
+        for iteration in range(total):
+            for case in cases:
+                if iteration == options['warmup']:
+                    with CaptureQueriesContext(connection) as captured:
+                        self.request(client, case, context)
+                    queries[case.name] = len(captured.captured_queries)
+                    continue
+                elapsed = self.request(client, case, context)
+                if iteration > options['warmup']:
+                    timings[case.name].append(elapsed)
+        return {
+            case.name: {
+                'queries': queries[case.name],
+                **{
+                    f'p{percent}': round(
+                        percentile(timings[case.name], percent), 3
+                    )
+                    for percent in PERCENTILES
+                },
+            }
+            for case in cases
+        }
+
+    def report(self, results, baseline, options):
+        """Write results table and return names of regressed cases."""
+        regressions = []
+        self.stdout.write(
+            f'{"case":<36}{"queries":>8}'
+            + ''.join(f'{f"p{percent}, ms":>11}' for percent in PERCENTILES)
+            + f'{"baseline p90":>14}'
+        )
+        for name, result in results.items():
+            line = (
+                f'{name:<36}{result["queries"]:>8}'
+                + ''.join(
+                    f'{result[f"p{percent}"]:>11.2f}'
+                    for percent in PERCENTILES
+                )
+            )
+            base = baseline.get(name)
+            if base is not None:
+                line += f'{base["p90"]:>14.2f}'
+                slow = result['p90'] > (
+                    base['p90'] * (1 + options['threshold'])
+                    + options['min_delta']
+                )
+                more_queries = result['queries'] > (
+                    base['queries'] + options['query_threshold']
+                )
+                if more_queries:
+                    line += f'  (was {base["queries"]} queries)'
+                if slow or more_queries:
+                    regressions.append(name)
+                    line = self.style.ERROR(line)
+            self.stdout.write(line)
+        return regressions
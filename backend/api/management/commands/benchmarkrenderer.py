@@ -0,0 +1,96 @@
+import io
+import time
+from typing import Any
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.parsers import FastJSONParser
+from api.recipes.serializers import RecipeSerializer
+from api.renderers import FastJSONRenderer, orjson
+from api.utils import percentile
+from recipes.models import Recipe
+
+PERCENTILES = (50, 90, 99)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость JSON рендерера и парсера API со стандартными '
+        'на странице рецептов'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=100,
+            help='Количество рецептов на странице.'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Количество замеров.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options['recipes'] < 1 or options['iterations'] < 1:
+            raise CommandError('--recipes and --iterations must be positive')
+        if orjson is None:
+            self.stderr.write('orjson is not installed, fallback is measured')
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        recipes = Recipe.objects.all()[:options['recipes']]
+        data = {
+            'count': len(recipes),
+            'next': None,
+            'previous': None,
+            'results': RecipeSerializer(
+                recipes, many=True, context={'request': request}
+            ).data,
+        }
+        content = JSONRenderer().render(data)
+        fast_content = FastJSONRenderer().render(data)
+        if fast_content != content:
+            raise CommandError('Rendered JSON differs from JSONRenderer')
+        if FastJSONParser().parse(
+            io.BytesIO(content)
+        ) != JSONParser().parse(io.BytesIO(content)):
+            raise CommandError('Parsed data differs from JSONParser')
+        self.stdout.write(
+            f'Page with {len(recipes)} recipes, {len(content)} bytes, '
+            'output is identical'
+        )
+        self.stdout.write(
+            f'{"case":<24}'
+            + ''.join(f'{f"p{percent}, ms":>11}' for percent in PERCENTILES)
+        )
+        cases = (
+            ('JSONRenderer', lambda: JSONRenderer().render(data)),
+            ('FastJSONRenderer', lambda: FastJSONRenderer().render(data)),
+            ('JSONParser', lambda: JSONParser().parse(io.BytesIO(content))),
+            (
+                'FastJSONParser',
+                lambda: FastJSONParser().parse(io.BytesIO(content))
+            ),
+        )
+        for name, function in cases:
+            timings = []
+            for _ in range(options['iterations']):
+                started = time.perf_counter()
+                function()
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f'{name:<24}'
+                + ''.join(
+                    f'{percentile(timings, percent):>11.3f}'
+                    for percent in PERCENTILES
+                )
+            )
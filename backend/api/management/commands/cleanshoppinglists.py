@@ -0,0 +1,43 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from api.utils import prune_cached_pdfs
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет кешированные PDF файлы списков покупок, которые давно '
+        'не скачивались'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--max-age-hours',
+            type=float,
+            default=settings.SHOPPING_LIST_TTL_HOURS,
+            help='Удалять файлы, не использованные дольше этого времени.'
+        )
+        parser.add_argument(
+            '--max-files',
+            type=int,
+            help='Максимальное количество файлов, давно не использованные '
+                 'файлы сверх него удаляются.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options['max_age_hours'] < 0:
+            raise CommandError('--max-age-hours must not be negative')
+        if options['max_files'] is not None and options['max_files'] < 0:
+            raise CommandError('--max-files must not be negative')
+        removed = prune_cached_pdfs(
+            options['max_age_hours'] * 3600, options['max_files']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully removed {removed} shopping lists'
+        ))
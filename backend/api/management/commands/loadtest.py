@@ -0,0 +1,412 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Optional
+
+import requests
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from api.utils import percentile
+
+DEFAULT_COLLECTION = (
+    settings.BASE_DIR.parent
+    / 'postman-collection'
+    / 'diploma.postman_collection.json'
+)
+VARIABLE_REGEX = re.compile(r'{{(\w+)}}')
+LOCAL_VARIABLE_REGEX = re.compile(
+    r'const (\w+) = _\.get\(responseData, ["\']([\w.]+)["\']\)'
+)
+SET_VARIABLE_REGEX = re.compile(
+    r'pm\.collectionVariables\.set\(["\'](\w+)["\'],\s*(.+?)\);?\s*$',
+    re.MULTILINE
+)
+RESPONSE_PATH_REGEX = re.compile(
+    r'^responseData((?:\[\d+\]|\.\w+)*?)'
+    r'(?:\.slice\((\d+),\s*(\d+)\))?$'
+)
+PATH_PART_REGEX = re.compile(r'\[(\d+)\]|\.(\w+)')
+STATUS_REGEX = re.compile(
+    r'pm\.response\.status,.*?\)\.to\.be\.eql\(["\']([\w ]+)["\']\)',
+    re.DOTALL
+)
+STATUS_CODES = {status.phrase: status.value for status in HTTPStatus}
+UNIQUE_VARIABLE_REGEX = re.compile(r'email|username', re.IGNORECASE)
+HISTOGRAM_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class Step:
+    """
+    One request of the collection.
+
+    `extract` maps collection variable name to response JSON path,
+    path items are list indexes or dictionary keys, the last item can be
+    a `slice` object.
+    """
+
+    name: str
+    folder: str
+    method: str
+    url: str
+    body: Optional[str]
+    headers: dict
+    status: Optional[int]
+    extract: dict = field(default_factory=dict)
+
+
+def parse_response_path(expression, local_variables):
+    """Return JSON path for Postman test script value expression."""
+    expression = expression.strip()
+    if expression in local_variables:
+        return local_variables[expression]
+    match = RESPONSE_PATH_REGEX.match(expression)
+    if match is None:
+        return None
+    path = [
+        int(index) if index else key
+        for index, key in PATH_PART_REGEX.findall(match.group(1))
+    ]
+    if match.group(2) is not None:
+        path.append(slice(int(match.group(2)), int(match.group(3))))
+    return path
+
+
+def parse_script(script):
+    """Return expected status and variables extracted by test script."""
+    status = STATUS_REGEX.search(script)
+    local_variables = {
+        name: path.split('.')
+        for name, path in LOCAL_VARIABLE_REGEX.findall(script)
+    }
+    extract = {}
+    for name, expression in SET_VARIABLE_REGEX.findall(script):
+        path = parse_response_path(expression, local_variables)
+        if path is not None:
+            extract[name] = path
+    return (
+        STATUS_CODES.get(status.group(1)) if status else None,
+        extract,
+    )
+
+
+def auth_headers(auth):
+    if auth is None or auth.get('type') != 'apikey':
+        return {}
+    values = {item['key']: item['value'] for item in auth['apikey']}
+    return {values['key']: values['value']}
+
+
+def parse_collection(items, folder='', auth=None):
+    """Flatten collection folders into list of steps in run order."""
+    steps = []
+    for item in items:
+        item_auth = item.get('auth', auth)
+        if 'item' in item:
+            steps.extend(parse_collection(
+                item['item'],
+                folder or item['name'],
+                item_auth
+            ))
+            continue
+        request = item['request']
+        script = '\n'.join(
+            '\n'.join(event['script'].get('exec', []))
+            for event in item.get('event', [])
+            if event['listen'] == 'test'
+        )
+        status, extract = parse_script(script)
+        url = request['url']
+        headers = {
+            header['key']: header['value']
+            for header in request.get('header', [])
+            if not header.get('disabled')
+        }
+        headers.update(auth_headers(request.get('auth', item_auth)))
+        body = request.get('body', {}).get('raw')
+        if body:
+            headers.setdefault('Content-Type', 'application/json')
+        steps.append(Step(
+            name=item['name'],
+            folder=folder,
+            method=request['method'],
+            url=url['raw'] if isinstance(url, dict) else url,
+            body=body or None,
+            headers=headers,
+            status=status,
+            extract=extract,
+        ))
+    return steps
+
+
+def extract_value(data, path):
+    for key in path:
+        data = data[key]
+    return data
+
+
+class VirtualUser(threading.Thread):
+    """Thread replaying collection steps with its own variables."""
+
+    def __init__(self, number, command, options):
+        super().__init__(daemon=True)
+        self.number = number
+        self.command = command
+        self.options = options
+        self.random = random.Random(f'{options["seed"]}-{number}')
+        self.session = requests.Session()
+
+    def variables(self, iteration):
+        """Return collection variables with unique users credentials."""
+        suffix = f'{self.command.run_id}-{self.number}-{iteration}'
+        variables = dict(self.command.variables)
+        for name, value in variables.items():
+            if (not UNIQUE_VARIABLE_REGEX.search(name)
+                    or name.startswith('tooLong')):
+                continue
+            if '@' in value:
+                variables[name] = value.replace('@', f'-{suffix}@', 1)
+            elif value.endswith('"'):
+                variables[name] = f'{value[:-1]}-{suffix}"'
+        return variables
+
+    def run(self):
+        time.sleep(
+            self.options['ramp_up'] * self.number
+            / max(self.options['users'], 1)
+        )
+        iteration = 0
+        while not self.command.finished(iteration):
+            variables = self.variables(iteration)
+            for step in self.command.steps:
+                self.run_step(step, variables)
+                if self.options['think_time']:
+                    time.sleep(self.random.expovariate(
+                        1 / self.options['think_time']
+                    ))
+            iteration += 1
+
+    def run_step(self, step, variables):
+        def substitute(value):
+            return VARIABLE_REGEX.sub(
+                lambda match: str(variables.get(match[1], match[0])),
+                value
+            )
+        started = time.perf_counter()
+        error = None
+        try:
+            response = self.session.request(
+                step.method,
+                substitute(step.url),
+                data=(
+                    substitute(step.body).encode()
+                    if step.body else None
+                ),
+                headers={
+                    key: substitute(value)
+                    for key, value in step.headers.items()
+                },
+                timeout=self.options['timeout'],
+            )
+            content = response.content
+            elapsed = time.perf_counter() - started
+            if step.status is not None:
+                if response.status_code != step.status:
+                    error = f'status {response.status_code}'
+            elif response.status_code >= 400:
+                error = f'status {response.status_code}'
+            if step.extract and error is None:
+                data = json.loads(content)
+                for name, path in step.extract.items():
+                    variables[name] = extract_value(data, path)
+        except requests.RequestException as request_error:
+            elapsed = time.perf_counter() - started
+            error = type(request_error).__name__
+        except (ValueError, LookupError, TypeError):
+            error = 'unexpected response'
+        self.command.record(step, elapsed * 1000, error)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочное тестирование запущенного сервера сценариями из '
+        'Postman коллекции'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--collection',
+            default=DEFAULT_COLLECTION,
+            help='Файл Postman коллекции.'
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Адрес сервера, заменяет переменную baseUrl коллекции.'
+        )
+        parser.add_argument(
+            '--folders',
+            nargs='*',
+            default=(),
+            help='Выполнять только указанные папки верхнего уровня.'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=10,
+            help='Количество одновременных виртуальных пользователей.'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=1,
+            help='Количество прогонов сценария каждым пользователем.'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            help='Длительность теста в секундах, заменяет --iterations.'
+        )
+        parser.add_argument(
+            '--think-time',
+            type=float,
+            default=0.0,
+            help='Средняя пауза между запросами пользователя, секунд.'
+        )
+        parser.add_argument(
+            '--ramp-up',
+            type=float,
+            default=0.0,
+            help='Время запуска всех пользователей, секунд.'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30.0,
+            help='Таймаут запроса, секунд.'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора пауз.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options['users'] < 1 or options['iterations'] < 1:
+            raise CommandError('--users and --iterations must be positive')
+        try:
+            with open(options['collection'], encoding='utf-8') as file:
+                collection = json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Wrong collection file: {error}')
+        self.steps = [
+            step for step in parse_collection(collection['item'])
+            if not options['folders'] or step.folder in options['folders']
+        ]
+        if not self.steps:
+            raise CommandError('No requests to run')
+        self.variables = {
+            variable['key']: variable['value']
+            for variable in collection.get('variable', [])
+        }
+        if options['base_url']:
+            self.variables['baseUrl'] = options['base_url'].rstrip('/')
+        self.options = options
+        self.run_id = uuid.uuid4().hex[:8]
+        self.results = {}
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        users = [
+            VirtualUser(number, self, options)
+            for number in range(options['users'])
+        ]
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        self.report(time.perf_counter() - self.started)
+
+    def finished(self, iteration):
+        if self.options['duration'] is not None:
+            return (
+                time.perf_counter() - self.started
+                >= self.options['duration']
+            )
+        return iteration >= self.options['iterations']
+
+    def record(self, step, elapsed, error):
+        with self.lock:
+            result = self.results.setdefault(
+                step.name, {'timings': [], 'errors': {}}
+            )
+            result['timings'].append(elapsed)
+            if error is not None:
+                result['errors'][error] = result['errors'].get(error, 0) + 1
+
+    def report(self, duration):
+        timings = [
+            elapsed
+            for result in self.results.values()
+            for elapsed in result['timings']
+        ]
+        errors = sum(
+            sum(result['errors'].values())
+            for result in self.results.values()
+        )
+        self.stdout.write(
+            f'{"request":<48}{"count":>7}{"errors":>8}'
+            + ''.join(f'{f"p{percent}, ms":>11}' for percent in PERCENTILES)
+        )
+        for name, result in self.results.items():
+            line = (
+                f'{name[:47]:<48}{len(result["timings"]):>7}'
+                f'{sum(result["errors"].values()):>8}'
+                + ''.join(
+                    f'{percentile(result["timings"], percent):>11.1f}'
+                    for percent in PERCENTILES
+                )
+            )
+            if result['errors']:
+                line = self.style.ERROR(
+                    line + '  ' + ', '.join(
+                        f'{error}: {count}'
+                        for error, count in result['errors'].items()
+                    )
+                )
+            self.stdout.write(line)
+        self.stdout.write('\nLatency histogram, ms:')
+        bounds = (*HISTOGRAM_BUCKETS, float('inf'))
+        counts = [0] * len(bounds)
+        for elapsed in timings:
+            counts[next(
+                index for index, bound in enumerate(bounds)
+                if elapsed <= bound
+            )] += 1
+        for bound, count in zip(bounds, counts):
+            label = (
+                f'<= {bound}' if bound != float('inf')
+                else f'> {HISTOGRAM_BUCKETS[-1]}'
+            )
+            share = count / len(timings) if timings else 0
+            self.stdout.write(
+                f'{label:>9}{count:>9} {share:>7.1%} '
+                + '#' * round(share * 50)
+            )
+        self.stdout.write(
+            f'\nRequests: {len(timings)}, errors: {errors} '
+            f'({errors / max(len(timings), 1):.1%}), '
+            f'duration: {duration:.1f} s, '
+            f'throughput: {len(timings) / duration:.1f} req/s'
+        )
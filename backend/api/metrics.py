@@ -0,0 +1,295 @@
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERIES_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+ARCHIVE_FILE = 'archive.json'
+LOCK_FILE = 'metrics.lock'
+METRICS = {
+    'foodgram_http_requests_total': (
+        'counter', 'Total number of API requests.', None
+    ),
+    'foodgram_http_request_errors_total': (
+        'counter', 'Number of API requests with server errors.', None
+    ),
+    'foodgram_http_request_duration_seconds': (
+        'histogram', 'API request duration.', LATENCY_BUCKETS
+    ),
+    'foodgram_db_queries_per_request': (
+        'histogram', 'Number of database queries per API request.',
+        QUERIES_BUCKETS
+    ),
+    'foodgram_db_duration_seconds': (
+        'histogram', 'Database time per API request.', LATENCY_BUCKETS
+    ),
+    'foodgram_cache_requests_total': (
+        'counter', 'Number of cache lookups by result.', None
+    ),
+    'foodgram_pdf_render_duration_seconds': (
+        'histogram', 'Shopping list PDF rendering duration.',
+        LATENCY_BUCKETS
+    ),
+}
+
+
+def dump(counters, histograms):
+    """Return metrics values as JSON serializable dictionary."""
+    return {
+        'counters': [
+            [name, labels, value]
+            for (name, labels), value in counters.items()
+        ],
+        'histograms': [
+            [name, labels, counts, total]
+            for (name, labels), (counts, total) in histograms.items()
+        ],
+    }
+
+
+class Registry:
+    """
+    Metrics of one worker process.
+
+    Values are flushed to `METRICS_DIR/<pid>-<id>.json` file not more
+    often than every `METRICS_FLUSH_INTERVAL` seconds, files of all
+    workers are summed up on exposition. Files of finished workers are
+    merged into `ARCHIVE_FILE` by `mark_process_dead`, so counters never
+    decrease and number of files is bounded by number of workers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.name = f'{self.pid}-{uuid.uuid4().hex[:8]}.json'
+        self.counters = {}
+        self.histograms = {}
+        self.flushed = 0.0
+
+    def check_fork(self):
+        """Drop values inherited from parent process."""
+        if os.getpid() != self.pid:
+            self.reset()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.check_fork()
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.check_fork()
+            counts, total = self.histograms.get(
+                key, ([0] * (len(buckets) + 1), 0.0)
+            )
+            counts[bisect_left(buckets, value)] += 1
+            self.histograms[key] = (counts, total + value)
+
+    def dump(self):
+        return dump(self.counters, self.histograms)
+
+    def flush(self, force=False):
+        """Atomically write process metrics to its file."""
+        now = time.monotonic()
+        with self.lock:
+            self.check_fork()
+            if not force and now - self.flushed < (
+                settings.METRICS_FLUSH_INTERVAL
+            ):
+                return
+            self.flushed = now
+            data = json.dumps(self.dump())
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            'w', dir=directory, suffix='.tmp', delete=False
+        ) as file:
+            file.write(data)
+        os.replace(file.name, directory / self.name)
+
+
+registry = Registry()
+
+
+def inc(name, value=1, **labels):
+    """Increase counter metric."""
+    registry.inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    """Add value to histogram metric."""
+    registry.observe(name, value, **labels)
+
+
+def view_labels(request):
+    """Return view class name and action of the request."""
+    match = request.resolver_match
+    if match is None:
+        return {'view': '', 'action': ''}
+    view = getattr(match.func, 'cls', None) or getattr(
+        match.func, 'view_class', None
+    )
+    actions = getattr(match.func, 'actions', None) or {}
+    return {
+        'view': view.__name__ if view else match.view_name,
+        'action': actions.get(request.method.lower(), request.method.lower()),
+    }
+
+
+def observe_request(request, response, timings):
+    """Record API request metrics from its timings."""
+    labels = view_labels(request)
+    inc(
+        'foodgram_http_requests_total',
+        method=request.method,
+        status=str(response.status_code),
+        **labels
+    )
+    if response.status_code >= 500:
+        inc('foodgram_http_request_errors_total', **labels)
+    observe('foodgram_http_request_duration_seconds', timings.total, **labels)
+    observe('foodgram_db_queries_per_request', timings.queries, **labels)
+    observe('foodgram_db_duration_seconds', timings.db, **labels)
+    registry.flush()
+
+
+def read(paths):
+    """Return metrics from files summed up, unreadable files are skipped."""
+    counters = {}
+    histograms = {}
+    for path in paths:
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in data['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, counts, total in data['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            summed_counts, summed_total = histograms.get(
+                key, ([0] * len(counts), 0.0)
+            )
+            histograms[key] = (
+                [a + b for a, b in zip(summed_counts, counts)],
+                summed_total + total,
+            )
+    return counters, histograms
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@contextmanager
+def locked(directory, operation):
+    """Hold lock of metrics directory, so merge is not seen half done."""
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / LOCK_FILE, 'a') as lock:
+        fcntl.flock(lock, operation)
+        yield
+
+
+def mark_process_dead(pid=None):
+    """
+    Merge metrics files of finished processes into archive file.
+
+    Without `pid` files of all not running processes are merged. Call it
+    from gunicorn `child_exit` hook, so directory doesn't grow with
+    every worker restart.
+    """
+    directory = Path(settings.METRICS_DIR)
+    if not directory.is_dir():
+        return
+    with locked(directory, fcntl.LOCK_EX):
+        dead = []
+        for path in directory.glob('*-*.json'):
+            try:
+                file_pid = int(path.name.split('-', 1)[0])
+            except ValueError:
+                continue
+            if file_pid == pid or (pid is None and not is_alive(file_pid)):
+                dead.append(path)
+        if not dead:
+            return
+        archive = directory / ARCHIVE_FILE
+        data = json.dumps(dump(*read([archive, *dead])))
+        with tempfile.NamedTemporaryFile(
+            'w', dir=directory, suffix='.tmp', delete=False
+        ) as file:
+            file.write(data)
+        os.replace(file.name, archive)
+        for path in dead:
+            path.unlink(missing_ok=True)
+
+
+def collect():
+    """Return metrics of all worker processes summed up."""
+    registry.flush(force=True)
+    directory = Path(settings.METRICS_DIR)
+    with locked(directory, fcntl.LOCK_SH):
+        return read(directory.glob('*.json'))
+
+
+def format_labels(labels, **extra):
+    labels = (*labels, *extra.items())
+    if not labels:
+        return ''
+    return '{%s}' % ','.join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n')
+        )
+        for key, value in labels
+    )
+
+
+def render():
+    """Return metrics in Prometheus text exposition format."""
+    counters, histograms = collect()
+    lines = []
+    for name, (kind, description, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{format_labels(labels)} {value}')
+            continue
+        for (metric, labels), (counts, total) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{format_labels(labels, le=bound)} '
+                    f'{cumulative}'
+                )
+            lines.append(f'{name}_sum{format_labels(labels)} {total}')
+            lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
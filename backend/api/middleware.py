@@ -0,0 +1,98 @@
+import json
+import logging
+import random
+
+from django.conf import settings
+from django.db import connection
+
+from api import compression, metrics, slow_queries, timing
+
+logger = logging.getLogger('api.performance')
+slow_logger = logging.getLogger('api.performance.slow')
+
+
+class ServerTimingMiddleware:
+    """
+    Measure API requests performance.
+
+    For requests with `API_PREFIX` path prefix collects total, database,
+    views with serializers, PDF rendering and remaining time and number
+    of queries. With `SERVER_TIMING` setting timings are returned in
+    `Server-Timing` header, they are logged as JSON line to
+    `api.performance` logger at INFO level. Requests slower than
+    `SLOW_REQUEST_MS` are sampled with `SLOW_REQUEST_SAMPLE_RATE`
+    probability and logged to `api.performance.slow` logger, with
+    `SLOW_REQUEST_SQL` setting with their SQL queries text, parameters
+    are never logged. Request metrics are added to
+    `api.metrics` registry. With `SLOW_QUERY_LOG` setting queries longer
+    than `SLOW_QUERY_MS` are saved with their plans to `SlowQuery` model.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith(settings.API_PREFIX):
+            return self.get_response(request)
+        timings, token = timing.start(
+            settings.SLOW_REQUEST_MAX_QUERIES * settings.SLOW_REQUEST_SQL,
+            settings.SLOW_QUERY_MS if settings.SLOW_QUERY_LOG else None
+        )
+        try:
+            with connection.execute_wrapper(timings.execute_wrapper):
+                response = self.get_response(request)
+            timings.finish()
+        finally:
+            timing.stop(token)
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = timings.server_timing()
+        metrics.observe_request(request, response, timings)
+        slow_queries.save(request, timings)
+        slow = (
+            timings.total * 1000 >= settings.SLOW_REQUEST_MS
+            and random.random() < settings.SLOW_REQUEST_SAMPLE_RATE
+        )
+        if not slow and not logger.isEnabledFor(logging.INFO):
+            return response
+        record = self.record(request, response, timings)
+        logger.info(json.dumps(record))
+        if slow:
+            if settings.SLOW_REQUEST_SQL:
+                record['sql'] = [
+                    {'sql': sql, 'duration': round(duration * 1000, 2)}
+                    for sql, duration in timings.sql
+                ]
+            slow_logger.warning(json.dumps(record))
+        return response
+
+    def record(self, request, response, timings):
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': timings.queries,
+        }
+        record.update(
+            (name, round(duration, 2))
+            for name, duration in timings.metrics().items()
+        )
+        return record
+
+
+class CompressionMiddleware:
+    """
+    Compress API responses with brotli (if installed) or gzip.
+
+    Precompressed content of cached responses is used as is.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not request.path.startswith(settings.API_PREFIX):
+            return response
+        return compression.compress_response(request, response)
@@ -0,0 +1,62 @@
+from django.db import models
+
+from foodgram_backend import constants
+
+
+class SlowQuery(models.Model):
+    """
+    Slow database query of API request.
+
+    Fields:
+    * created (DateTime);
+    * duration (Float) - query duration in milliseconds;
+    * sql (Text);
+    * params (Text) - bound parameters representation;
+    * view (Char(200)) - view class name;
+    * action (Char(200)) - view action;
+    * path (Text) - request path;
+    * plan (Text) - query plan, empty if query was not explained.
+    """
+
+    created = models.DateTimeField(
+        verbose_name='Дата',
+        auto_now_add=True
+    )
+    duration = models.FloatField(
+        verbose_name='Длительность, мс'
+    )
+    sql = models.TextField(
+        verbose_name='SQL'
+    )
+    params = models.TextField(
+        verbose_name='Параметры',
+        blank=True
+    )
+    view = models.CharField(
+        verbose_name='Представление',
+        max_length=constants.NAME_MAX_LENGTH,
+        blank=True
+    )
+    action = models.CharField(
+        verbose_name='Действие',
+        max_length=constants.NAME_MAX_LENGTH,
+        blank=True
+    )
+    path = models.TextField(
+        verbose_name='Путь',
+        blank=True
+    )
+    plan = models.TextField(
+        verbose_name='План запроса',
+        blank=True
+    )
+
+    class Meta:
+        verbose_name = 'Медленный запрос'
+        verbose_name_plural = 'Медленные запросы'
+        ordering = (
+            '-id',
+        )
+
+    def __str__(self) -> str:
+        return f'{self.duration:.1f} мс: {self.sql[:50]}'
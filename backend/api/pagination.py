@@ -1,5 +1,169 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class PageNumberLimitPagination(PageNumberPagination):
     page_size_query_param = 'limit'
+
+
+class KeysetOptionalPagination(PageNumberLimitPagination):
+    """
+    Page number pagination with optional keyset (cursor) pagination.
+
+    Request with `cursor` query parameter (empty for the first page) gets
+    page after position encoded in cursor and link to the next page.
+    Position is compared by all ordering fields with primary key as tie
+    breaker, so every page is read by index range instead of offset.
+    Ordering fields must be model fields with the same direction, other
+    orderings (like search relevance) fall back to page number
+    pagination.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.ordering = self.get_ordering(queryset)
+        self.keyset = self.ordering is not None and (
+            self.cursor_query_param in request.query_params
+        )
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.after(position))
+            except (TypeError, ValueError, DjangoValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        page = list(queryset[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def get_ordering(self, queryset):
+        """
+        Return queryset ordering with primary key tie breaker.
+
+        Return None if ordering is not supported by keyset pagination.
+        """
+        ordering = list(
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        if not ordering:
+            ordering = ['pk']
+        descending = ordering[0].startswith('-')
+        for name in ordering:
+            if not isinstance(name, str) or (
+                name.startswith('-') != descending
+            ):
+                return None
+            try:
+                if name.lstrip('-') != 'pk':
+                    queryset.model._meta.get_field(name.lstrip('-'))
+            except FieldDoesNotExist:
+                return None
+        if ordering[-1].lstrip('-') not in (
+            'pk', queryset.model._meta.pk.name
+        ):
+            ordering.append('-pk' if descending else 'pk')
+        return ordering
+
+    def after(self, position):
+        """Return condition selecting rows after position."""
+        descending = self.ordering[0].startswith('-')
+        lookup = 'lt' if descending else 'gt'
+        names = [name.lstrip('-') for name in self.ordering]
+        condition = Q()
+        for index, name in enumerate(names):
+            equal = {
+                previous: position[number]
+                for number, previous in enumerate(names[:index])
+            }
+            condition |= Q(
+                **equal, **{f'{name}__{lookup}': position[index]}
+            )
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or (
+            len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, instance):
+        position = []
+        for name in self.ordering:
+            name = name.lstrip('-')
+            field = (
+                instance._meta.pk if name == 'pk'
+                else instance._meta.get_field(name)
+            )
+            position.append(field.value_to_string(instance))
+        return base64.urlsafe_b64encode(
+            json.dumps(position).encode()
+        ).decode()
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.page[-1])
+        )
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+
+class FeedPagination(KeysetOptionalPagination):
+    """
+    Keyset pagination of `recipes.feed.Feed`.
+
+    Feed is always read by cursor, request without `cursor` gets the
+    first page. Every page reads only page size items from each feed
+    source after position of the previous page last recipe.
+    """
+
+    ordering = ('-pub_date', '-pk')
+
+    def paginate_queryset(self, feed, request, view=None):
+        self.keyset = True
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        try:
+            page = feed.page(position, self.page_size + 1)
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
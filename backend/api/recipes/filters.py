@@ -1,6 +1,44 @@
+from django import forms
+from django.db.models import Count, Exists, OuterRef
 from django_filters import rest_framework as filters
+from django_filters.widgets import QueryArrayWidget
 
-from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from recipes import search
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+)
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    """Filter by comma separated numbers."""
+
+
+class MultipleValueField(forms.Field):
+    """Field with list of strings from repeated query parameter."""
+
+    widget = QueryArrayWidget
+
+    def to_python(self, value):
+        if not value:
+            return []
+        return [str(item) for item in value]
+
+
+class MultipleValueFilter(filters.Filter):
+    """Filter by list of values without checking them in database."""
+
+    field_class = MultipleValueField
+
+
+RECIPE_ORDERINGS = {
+    'popularity': ('-favorites_count', '-pk'),
+    'cooking_time': ('cooking_time', 'pk'),
+    'newest': ('-pub_date', '-pk'),
+}
 
 
 class RecipeFilter(filters.FilterSet):
@@ -12,13 +50,21 @@ class RecipeFilter(filters.FilterSet):
     * author (int) - user pk;
     * is_favorited (bool) - include/exclude current user favorited recipes;
     * is_in_shopping_cart (bool) - include/exclude recipes in current user's
-    shopping cart.
+    shopping cart;
+    * search (str) - full-text search by name and text, results are
+    ordered by relevance, with `ordering` relevance orders recipes equal
+    by it; search results are paginated by page number, `cursor` is
+    ignored;
+    * ingredients (int, comma separated) - recipes with all of ingredients;
+    * exclude_ingredients (int, comma separated) - recipes without any of
+    ingredients;
+    * cooking_time_min, cooking_time_max (int) - cooking time range;
+    * ordering (popularity, cooking_time or newest) - recipes order, each
+    one has index and primary key tie breaker.
     """
 
-    tags = filters.ModelMultipleChoiceFilter(
-        to_field_name='slug',
-        field_name='tags__slug',
-        queryset=Tag.objects.all()
+    tags = MultipleValueFilter(
+        method='filter_tags'
     )
     is_favorited = filters.BooleanFilter(
         method='filter_favorite'
@@ -26,6 +72,20 @@ class RecipeFilter(filters.FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_shoppingcart'
     )
+    search = filters.CharFilter(
+        method='filter_search'
+    )
+    ingredients = NumberInFilter(
+        method='filter_ingredients'
+    )
+    exclude_ingredients = NumberInFilter(
+        method='filter_exclude_ingredients'
+    )
+    cooking_time = filters.RangeFilter()
+    ordering = filters.ChoiceFilter(
+        choices=[(name, name) for name in RECIPE_ORDERINGS],
+        method='filter_ordering'
+    )
 
     class Meta:
         model = Recipe
@@ -34,17 +94,28 @@ class RecipeFilter(filters.FilterSet):
             'tags',
             'is_favorited',
             'is_in_shopping_cart',
+            'search',
+            'ingredients',
+            'exclude_ingredients',
+            'cooking_time',
+            'ordering',
         )
 
     def include_filter(self, queryset, value, model):
+        """
+        Filter recipes with or without current user relation in `model`.
+
+        Uses correlated EXISTS / NOT EXISTS on unique (user, recipe)
+        index, anonymous user has no relations.
+        """
         user = getattr(self.request, 'user', None)
-        filter_queryset = model.objects.filter(user=user).values_list(
-            'recipe__pk',
-            flat=True
-        )
-        if value:
-            return queryset.filter(pk__in=filter_queryset)
-        return queryset.exclude(pk__in=filter_queryset)
+        if user is None or not user.is_authenticated:
+            return queryset.none() if value else queryset
+        exists = Exists(model.objects.filter(
+            user=user,
+            recipe=OuterRef('pk')
+        ))
+        return queryset.filter(exists if value else ~exists)
 
     def filter_favorite(self, queryset, name, value):
         return self.include_filter(queryset, value, Favorite)
@@ -52,12 +123,49 @@ class RecipeFilter(filters.FilterSet):
     def filter_shoppingcart(self, queryset, name, value):
         return self.include_filter(queryset, value, ShoppingCart)
 
+    def filter_tags(self, queryset, name, value):
+        """Semi-join with recipes having any of tags."""
+        return queryset.filter(Exists(Recipe.tags.through.objects.filter(
+            recipe=OuterRef('pk'),
+            tag__slug__in=value
+        )))
+
+    def filter_search(self, queryset, name, value):
+        return search.search(queryset, value)
+
+    def filter_ordering(self, queryset, name, value):
+        """Order by chosen fields, search results then by relevance."""
+        *ordering, tie_breaker = RECIPE_ORDERINGS[value]
+        if search.RANK in queryset.query.annotations:
+            ordering.append(f'-{search.RANK}')
+        return queryset.order_by(*ordering, tie_breaker)
+
+    def filter_ingredients(self, queryset, name, value):
+        """Semi-join with recipes having all ingredients."""
+        ingredients = set(value)
+        return queryset.filter(pk__in=RecipeIngredient.objects.filter(
+            ingredient__in=ingredients
+        ).values(
+            'recipe'
+        ).annotate(
+            ingredients_count=Count('ingredient')
+        ).filter(
+            ingredients_count=len(ingredients)
+        ).values('recipe'))
+
+    def filter_exclude_ingredients(self, queryset, name, value):
+        """Anti-join with recipes having any of ingredients."""
+        return queryset.filter(~Exists(RecipeIngredient.objects.filter(
+            recipe=OuterRef('pk'),
+            ingredient__in=value
+        )))
+
 
 class IngredientFilter(filters.FilterSet):
-    """Filter ingredients by name from start."""
+    """Filter ingredients by name from start, case insensitive."""
 
     name = filters.CharFilter(
-        lookup_expr='startswith'
+        lookup_expr='istartswith'
     )
 
     class Meta:
@@ -3,6 +3,7 @@ from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
 from .fields import ImageFieldURL
+from api.sparse_fields import SparseFieldsMixin
 from foodgram_backend import constants
 from recipes.models import (
     Favorite,
@@ -156,7 +157,7 @@ class RecipeIngredientCreateSerializer(serializers.ModelSerializer):
         )
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Recipe model serializer.
 
@@ -173,6 +174,8 @@ class RecipeSerializer(serializers.ModelSerializer):
     * image - coded in base64;
     * text;
     * cooking_time.
+
+    Fields can be selected by `fields` and `omit` query parameters.
     """
 
     from api.users.serializers import CustomUserSerializer
@@ -204,20 +207,24 @@ class RecipeSerializer(serializers.ModelSerializer):
             'cooking_time',
         )
 
-    def _is_in(self, obj, model) -> bool:
+    def _is_in(self, obj, model, annotation) -> bool:
         """
         Checks if `obj` in `model` for current user.
+
+        Uses queryset `annotation` if it's present.
         """
+        if hasattr(obj, annotation):
+            return getattr(obj, annotation)
         user = self.context['request'].user
         if user.is_authenticated:
             return model.objects.filter(user=user.pk, recipe=obj.pk).exists()
         return False
 
     def get_is_in_shopping_cart(self, obj):
-        return self._is_in(obj, ShoppingCart)
+        return self._is_in(obj, ShoppingCart, 'is_in_shopping_cart')
 
     def get_is_favorited(self, obj):
-        return self._is_in(obj, Favorite)
+        return self._is_in(obj, Favorite, 'is_favorited')
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
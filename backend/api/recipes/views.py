@@ -1,8 +1,12 @@
-from django.db.models import F, Sum
-from django.http import FileResponse
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Prefetch, Sum
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from .filters import IngredientFilter, RecipeFilter
@@ -16,23 +20,36 @@ from .serializers import (
     TagSerializer,
 )
 from api import utils
+from api.pagination import FeedPagination, KeysetOptionalPagination
 from api.permissions import IsAuthorAdminOrReadOnly
+from api.response_cache import CachedResponseMixin
+from api.sparse_fields import requested_fields
+from api.timing import ServerTimingMixin
 from foodgram_backend import constants
+from recipes import feed, similarity
 from recipes.models import (
     Favorite,
     Ingredient,
     Recipe,
     RecipeIngredient,
+    RecipeSimilarity,
     ShoppingCart,
     Tag,
 )
+from users.models import Subscription
 
+User = get_user_model()
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+
+class TagViewSet(
+    ServerTimingMixin,
+    CachedResponseMixin,
+    viewsets.ReadOnlyModelViewSet
+):
     """
     Tag model ViewSet.
 
-    Include only list and retrive methods.
+    Include only list and retrive methods, responses are cached.
     """
 
     queryset = Tag.objects.all()
@@ -40,11 +57,15 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = None
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(
+    ServerTimingMixin,
+    CachedResponseMixin,
+    viewsets.ReadOnlyModelViewSet
+):
     """
     Ingredient model ViewSet.
 
-    Include only list and retrive methods.
+    Include only list and retrive methods, responses are cached.
     """
 
     queryset = Ingredient.objects.all()
@@ -56,14 +77,30 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_class = IngredientFilter
 
 
-class RecipeViewSet(PartialUpdateMixin, viewsets.ModelViewSet):
+class RecipeViewSet(
+    ServerTimingMixin,
+    CachedResponseMixin,
+    PartialUpdateMixin,
+    viewsets.ModelViewSet
+):
     """
     Recipe model ViewSet.
 
-    Accept all http methods except Put.
+    Accept all http methods except Put. List and retrieve load only
+    data of fields selected by `fields` and `omit` query parameters.
+    Recipe cards retrieved by anonymous users are cached. Lists are
+    paginated by page number or by keyset with `cursor` parameter.
 
     Methods
     -------
+    feed
+        Recipes of followed authors.
+    trending
+        Recipes popular last days.
+    similar
+        Recipes similar to specified one.
+    batch
+        Recipes with specified ids.
     shopping_cart
         Add or remove recipe from shopping cart.
     favorite
@@ -80,7 +117,67 @@ class RecipeViewSet(PartialUpdateMixin, viewsets.ModelViewSet):
         DjangoFilterBackend,
     )
     filterset_class = RecipeFilter
+    pagination_class = KeysetOptionalPagination
     queryset = Recipe.objects.all()
+    cached_actions = ('retrieve',)
+
+    def get_cache_groups(self, action, kwargs):
+        return ('tags', 'ingredients', f'recipe-{kwargs["pk"]}')
+
+    def is_cacheable(self, request, action):
+        return (super().is_cacheable(request, action)
+                and not request.user.is_authenticated)
+
+    def get_queryset(self):
+        """
+        Return recipes with related data of requested fields.
+
+        Prefetches author, tags and ingredients and annotates current
+        user flags, so list page takes constant number of queries.
+        """
+        queryset = super().get_queryset()
+        if self.action not in (
+            'list', 'retrieve', 'feed', 'trending', 'similar', 'batch'
+        ):
+            return queryset
+        user = self.request.user
+        fields = requested_fields(self.request, RecipeSerializer.Meta.fields)
+        if 'author' in fields:
+            authors = User.objects.all()
+            if user.is_authenticated:
+                authors = authors.annotate(is_subscribed=Exists(
+                    Subscription.objects.filter(
+                        user=user.pk,
+                        subscription=OuterRef('pk')
+                    )
+                ))
+            queryset = queryset.prefetch_related(
+                Prefetch('author', queryset=authors)
+            )
+        if 'tags' in fields:
+            queryset = queryset.prefetch_related('tags')
+        if 'ingredients' in fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                'recipeingredient_set',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient'
+                )
+            ))
+        if user.is_authenticated:
+            for field, model in (
+                ('is_favorited', Favorite),
+                ('is_in_shopping_cart', ShoppingCart),
+            ):
+                if field in fields:
+                    queryset = queryset.annotate(**{field: Exists(
+                        model.objects.filter(
+                            user=user.pk,
+                            recipe=OuterRef('pk')
+                        )
+                    )})
+        if 'text' not in fields:
+            queryset = queryset.defer('text')
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ('create', 'partial_update'):
@@ -88,10 +185,126 @@ class RecipeViewSet(PartialUpdateMixin, viewsets.ModelViewSet):
         return RecipeSerializer
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        with transaction.atomic():
+            recipe = serializer.save(author=self.request.user)
+            similarity.update_after_commit(recipe.pk)
 
     def perform_update(self, serializer):
-        serializer.save(author=self.request.user)
+        with transaction.atomic():
+            features = similarity.features(serializer.instance.pk)
+            recipe = serializer.save(author=self.request.user)
+            if similarity.features(recipe.pk) != features:
+                similarity.update_after_commit(recipe.pk)
+
+    @action(
+        ['get'],
+        detail=False,
+        permission_classes=(permissions.IsAuthenticated,),
+        pagination_class=FeedPagination
+    )
+    def feed(self, request):
+        """
+        Return recipes of authors followed by current user, newest first.
+
+        Get method. Availible only to authenticated users. Paginated by
+        cursor only, `next` link continues after the last recipe of page.
+        """
+        page = self.paginate_queryset(
+            feed.feed(self.get_queryset(), request.user)
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        ['get'],
+        detail=False
+    )
+    def trending(self, request):
+        """
+        Return precomputed trending recipes by rank.
+
+        Get method. List is updated by `updatetrending` command.
+        """
+        page = self.paginate_queryset(
+            self.get_queryset().filter(
+                trending__isnull=False
+            ).order_by('trending__rank')
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        ['get'],
+        detail=True
+    )
+    def similar(self, request, pk):
+        """
+        Return precomputed similar recipes, most similar first.
+
+        Get method. `kind` query parameter selects similarity source,
+        favorites by default. At most `SIMILAR_RECIPES_COUNT` recipes are
+        returned, unknown recipe returns 404.
+        """
+        recipe = get_object_or_404(Recipe.objects.only('pk'), pk=pk)
+        kind = request.query_params.get('kind', RecipeSimilarity.FAVORITES)
+        if kind not in dict(RecipeSimilarity.KINDS):
+            return Response(
+                {'kind': [constants.SIMILARITY_KIND_ERROR]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = self.get_queryset().filter(
+            similar_to__recipe=recipe,
+            similar_to__kind=kind
+        ).order_by(
+            '-similar_to__score', 'pk'
+        )[:settings.SIMILAR_RECIPES_COUNT]
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    def get_batch_ids(self):
+        """Return unique ids from `ids` query parameters in given order."""
+        ids = []
+        for value in self.request.query_params.getlist('ids'):
+            for pk in value.split(','):
+                try:
+                    pk = int(pk)
+                except ValueError:
+                    raise ValidationError(
+                        {'ids': [constants.RECIPE_IDS_ERROR]}
+                    )
+                if pk not in ids:
+                    ids.append(pk)
+        if not ids:
+            raise ValidationError({'ids': [constants.RECIPE_IDS_ERROR]})
+        if len(ids) > settings.RECIPES_BATCH_SIZE:
+            raise ValidationError({'ids': [
+                constants.RECIPE_IDS_LIMIT_ERROR.format(
+                    settings.RECIPES_BATCH_SIZE
+                )
+            ]})
+        return ids
+
+    @action(
+        ['get'],
+        detail=False
+    )
+    def batch(self, request):
+        """
+        Return recipes by comma separated `ids` in requested order.
+
+        Get method. Recipes are loaded by one query with related data
+        prefetched like list, ids of absent recipes are returned in
+        `missing`.
+        """
+        ids = self.get_batch_ids()
+        recipes = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [recipes[pk] for pk in ids if pk in recipes], many=True
+        )
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in recipes],
+        })
 
     def error_message(self, model):
         """Construct remove from model error message."""
@@ -178,6 +391,9 @@ class RecipeViewSet(PartialUpdateMixin, viewsets.ModelViewSet):
             measurement_unit=F('ingredient__measurement_unit')
         ).annotate(
             amount_sum=Sum('amount')
+        ).order_by(
+            'name',
+            'measurement_unit'
         )
         return ingredients_sum
 
@@ -190,10 +406,9 @@ class RecipeViewSet(PartialUpdateMixin, viewsets.ModelViewSet):
         """
         Return PDF file with shopping cart recipes ingredients.
 
-        Get method. Availible only to authenticated users.
+        Get method. Availible only to authenticated users. Rendered files
+        are cached, so the same shopping list is not rendered twice.
         """
         ingredients = self.get_ingredients()
-        pdf_buffer = utils.get_pdf(ingredients)
-        return FileResponse(
-            pdf_buffer, as_attachment=True, filename='shoppinglist.pdf'
-        )
+        pdf_path = utils.get_cached_pdf(ingredients)
+        return utils.send_file(request, pdf_path, 'shoppinglist.pdf')
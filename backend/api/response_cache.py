@@ -0,0 +1,146 @@
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.http import HttpResponse
+
+from api import compression, metrics
+
+VERSION_KEY = 'api-response-version:{}'
+RESPONSE_KEY = 'api-response:{}'
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def enabled():
+    """
+    Check if responses can be cached.
+
+    Cache must be shared by all workers, otherwise invalidation made by
+    one worker is not seen by others and they serve outdated responses,
+    so process local backends disable response caching.
+    """
+    return not isinstance(get_cache(), (LocMemCache, DummyCache))
+
+
+def invalidate(*groups):
+    """
+    Invalidate cached responses depending on given groups.
+
+    Versions are changed after transaction commit, so concurrent requests
+    can't cache data of not committed transaction under new versions.
+    """
+    if not groups or not enabled():
+        return
+    transaction.on_commit(lambda: get_cache().set_many(
+        {VERSION_KEY.format(group): uuid.uuid4().hex for group in groups},
+        None
+    ))
+
+
+def get_versions(groups):
+    cache = get_cache()
+    keys = [VERSION_KEY.format(group) for group in groups]
+    versions = cache.get_many(keys)
+    missing = {
+        key: uuid.uuid4().hex for key in keys if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+class CachedResponseMixin:
+    """
+    ViewSet mixin caching rendered JSON responses.
+
+    With shared cache backend (see `enabled`) responses of
+    `cached_actions` are cached for `RESPONSE_CACHE_TIMEOUT` seconds with
+    their compressed variants, so hits are neither rendered
+    nor compressed again. Cache keys include versions of groups returned
+    by `get_cache_groups`, groups are invalidated by `invalidate` on
+    data changes.
+    """
+
+    cached_actions = ('list', 'retrieve')
+
+    def get_cache_groups(self, action, kwargs):
+        return (self.basename,)
+
+    def is_cacheable(self, request, action):
+        return request.method == 'GET' and action in self.cached_actions
+
+    def get_cache_key(self, request, action, kwargs):
+        data = json.dumps([
+            get_versions(self.get_cache_groups(action, kwargs)),
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+        ])
+        return RESPONSE_KEY.format(hashlib.sha256(data.encode()).hexdigest())
+
+    def initial(self, request, *args, **kwargs):
+        """
+        Replace handler with cached response after request checks.
+
+        Cache is looked up after authentication, permissions and
+        throttling, so cached responses are served only to requests
+        allowed to get them. Key is built before data is read, so data
+        changed meanwhile is cached under outdated versions.
+        """
+        super().initial(request, *args, **kwargs)
+        self.response_cache_key = None
+        if not enabled() or not self.is_cacheable(request, self.action):
+            return
+        key = self.get_cache_key(request, self.action, kwargs)
+        cached = get_cache().get(key)
+        if cached is None:
+            metrics.inc(
+                'foodgram_cache_requests_total',
+                cache='response',
+                result='miss'
+            )
+            self.response_cache_key = key
+            return
+        metrics.inc(
+            'foodgram_cache_requests_total', cache='response', result='hit'
+        )
+        response = HttpResponse(cached['content'])
+        for header, value in cached['headers']:
+            response[header] = value
+        response.precompressed = cached['compressed']
+        setattr(
+            self,
+            request.method.lower(),
+            lambda request, *args, **kwargs: response
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        key = getattr(self, 'response_cache_key', None)
+        renderer = getattr(response, 'accepted_renderer', None)
+        if key is None or response.status_code != 200 or (
+            renderer is None or renderer.format != 'json'
+        ):
+            return response
+        response.render()
+        response.precompressed = compression.compress_all(response.content)
+        get_cache().set(
+            key,
+            {
+                'content': response.content,
+                'headers': list(response.items()),
+                'compressed': response.precompressed,
+            },
+            settings.RESPONSE_CACHE_TIMEOUT
+        )
+        return response
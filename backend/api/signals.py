@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.authentication import token_cache
+from api.response_cache import invalidate
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    """Drop cached token on logout or user deletion."""
+    token_cache.delete(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, update_fields=None, **kwargs):
+    """Drop cached user tokens on user change, e.g. deactivation."""
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    for key in Token.objects.filter(user=instance.pk).values_list(
+        'key', flat=True
+    ):
+        token_cache.delete(key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_responses(sender, instance, created=False,
+                                update_fields=None, **kwargs):
+    """
+    Invalidate cards of author recipes on author change.
+
+    New users have no recipes, login updates only `last_login`, so
+    these saves are skipped. Deleted author recipes are deleted by
+    cascade and invalidated by recipe signals.
+    """
+    if created or (
+        update_fields is not None and set(update_fields) <= {'last_login'}
+    ):
+        return
+    invalidate(*(
+        f'recipe-{pk}'
+        for pk in Recipe.objects.filter(author=instance.pk).values_list(
+            'pk', flat=True
+        )
+    ))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags_responses(sender, **kwargs):
+    invalidate('tags')
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredients_responses(sender, **kwargs):
+    invalidate('ingredients')
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_responses(sender, instance, **kwargs):
+    invalidate(f'recipe-{instance.pk}')
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def invalidate_recipe_ingredients_responses(sender, instance, **kwargs):
+    invalidate(f'recipe-{instance.recipe_id}')
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_recipe_relations_responses(sender, instance, action,
+                                          reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate(f'recipe-{instance.pk}')
+    elif pk_set:
+        invalidate(*(f'recipe-{pk}' for pk in pk_set))
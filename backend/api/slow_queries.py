@@ -0,0 +1,54 @@
+import random
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from api.metrics import view_labels
+from api.models import SlowQuery
+
+
+def explain(sql, params):
+    """Return plan of SELECT query or empty string."""
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return ''
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'{connection.ops.explain_query_prefix()} {sql}', params
+            )
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    except DatabaseError as error:
+        return f'EXPLAIN failed: {error}'
+
+
+def save(request, timings):
+    """
+    Save request slow queries to `SlowQuery` ring buffer.
+
+    Plans are captured for `SLOW_QUERY_EXPLAIN_RATE` share of queries.
+    Only the last `SLOW_QUERY_LOG_SIZE` queries are kept.
+    """
+    if not timings.slow_queries:
+        return
+    labels = view_labels(request)
+    SlowQuery.objects.bulk_create(
+        SlowQuery(
+            duration=duration * 1000,
+            sql=sql,
+            params=repr(params),
+            path=request.get_full_path(),
+            plan=(
+                explain(sql, params)
+                if not many
+                and random.random() < settings.SLOW_QUERY_EXPLAIN_RATE
+                else ''
+            ),
+            **labels
+        )
+        for sql, params, many, duration in timings.slow_queries
+    )
+    last = SlowQuery.objects.order_by('-id').values_list(
+        'id', flat=True
+    )[settings.SLOW_QUERY_LOG_SIZE:settings.SLOW_QUERY_LOG_SIZE + 1]
+    if last:
+        SlowQuery.objects.filter(id__lte=last[0]).delete()
@@ -0,0 +1,61 @@
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def split_param(value):
+    if not value:
+        return set()
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def requested_fields(request, fields):
+    """
+    Return fields selected by request query parameters.
+
+    `fields` parameter lists comma separated fields to return, `omit`
+    lists fields to exclude. Unknown field names are ignored.
+
+    Parameters
+    ----------
+    request : Request
+        Current request.
+    fields : iterable
+        All serializer field names.
+
+    Returns
+    -------
+    set
+        Selected field names.
+    """
+    selected = set(fields)
+    if request is None:
+        return selected
+    only = split_param(request.query_params.get(FIELDS_PARAM))
+    if only:
+        selected &= only
+    return selected - split_param(request.query_params.get(OMIT_PARAM))
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin pruning fields by `fields` and `omit` parameters.
+
+    Only top level serializer (or list serializer child) used for output
+    is pruned, nested serializers and serializers with input data keep
+    all fields.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None or hasattr(self.root, 'initial_data'):
+            return fields
+        selected = requested_fields(self.context.get('request'), fields)
+        return {
+            name: field for name, field in fields.items()
+            if name in selected
+        }
@@ -0,0 +1,86 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from foodgram_backend import constants
+from recipes.models import Favorite
+from recipes.tests.utils import create_recipe, create_tag, create_user
+
+BATCH_URL = '/api/recipes/batch/'
+
+
+class RecipesBatchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        author = create_user('author')
+        tag = create_tag('breakfast')
+        cls.recipes = [
+            create_recipe(author, name=f'Рецепт {number}', tags=(tag,))
+            for number in range(3)
+        ]
+        Favorite.objects.create(user=cls.user, recipe=cls.recipes[1])
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, ids, status_code=200):
+        response = self.client.get(BATCH_URL, {'ids': ids})
+        self.assertEqual(response.status_code, status_code)
+        return response.data
+
+    def test_order_and_missing(self):
+        first, second, third = (recipe.pk for recipe in self.recipes)
+        missing = third + 100
+        data = self.get(f'{third},{missing},{first},{third},{second}')
+        self.assertEqual(
+            [recipe['id'] for recipe in data['results']],
+            [third, first, second]
+        )
+        self.assertEqual(data['missing'], [missing])
+
+    def test_repeated_parameter(self):
+        first, second, _ = (recipe.pk for recipe in self.recipes)
+        data = self.get([str(second), str(first)])
+        self.assertEqual(
+            [recipe['id'] for recipe in data['results']], [second, first]
+        )
+
+    def test_user_flags(self):
+        self.client.force_authenticate(self.user)
+        data = self.get(','.join(str(recipe.pk) for recipe in self.recipes))
+        self.assertEqual(
+            [recipe['is_favorited'] for recipe in data['results']],
+            [False, True, False]
+        )
+
+    def test_sparse_fields(self):
+        response = self.client.get(
+            BATCH_URL, {'ids': self.recipes[0].pk, 'fields': 'id,name'}
+        )
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+
+    def test_constant_queries(self):
+        with self.assertNumQueries(4):
+            self.get(str(self.recipes[0].pk))
+        with self.assertNumQueries(4):
+            self.get(','.join(str(recipe.pk) for recipe in self.recipes))
+
+    def test_invalid_ids(self):
+        for ids in ('', '1,a', '1,,2', '1.5'):
+            with self.subTest(ids=ids):
+                self.assertEqual(
+                    self.get(ids, status_code=400),
+                    {'ids': [constants.RECIPE_IDS_ERROR]}
+                )
+        response = self.client.get(BATCH_URL)
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(RECIPES_BATCH_SIZE=2)
+    def test_limit(self):
+        first, second, third = (recipe.pk for recipe in self.recipes)
+        self.get(f'{first},{second},{first}')
+        self.assertEqual(
+            self.get(f'{first},{second},{third}', status_code=400),
+            {'ids': [constants.RECIPE_IDS_LIMIT_ERROR.format(2)]}
+        )
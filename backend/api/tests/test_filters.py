@@ -0,0 +1,125 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, ShoppingCart
+from recipes.tests.utils import (
+    create_ingredient,
+    create_recipe,
+    create_tag,
+    create_user,
+)
+
+RECIPES_URL = '/api/recipes/'
+
+
+class RecipeFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        author = create_user('author')
+        breakfast = create_tag('breakfast')
+        lunch = create_tag('lunch')
+        create_tag('dinner')
+        cls.flour = create_ingredient('мука')
+        cls.sugar = create_ingredient('сахар')
+        cls.salt = create_ingredient('соль')
+        cls.pancakes = create_recipe(
+            author, tags=(breakfast,), ingredients=(cls.flour, cls.sugar)
+        )
+        cls.soup = create_recipe(
+            author, tags=(lunch,), ingredients=(cls.salt,)
+        )
+        cls.bread = create_recipe(
+            author,
+            tags=(breakfast, lunch),
+            ingredients=(cls.flour, cls.salt)
+        )
+        cls.tea = create_recipe(author)
+        Favorite.objects.create(user=cls.user, recipe=cls.pancakes)
+        Favorite.objects.create(user=cls.user, recipe=cls.soup)
+        ShoppingCart.objects.create(user=cls.user, recipe=cls.soup)
+        Favorite.objects.create(user=author, recipe=cls.tea)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_pks(self, params, client=None):
+        response = (client or self.client).get(
+            RECIPES_URL, {**params, 'limit': 100}
+        )
+        self.assertEqual(response.status_code, 200)
+        return {recipe['id'] for recipe in response.data['results']}
+
+    def test_relations(self):
+        for params, expected in (
+            ({'is_favorited': 1}, {self.pancakes, self.soup}),
+            ({'is_favorited': 0}, {self.bread, self.tea}),
+            ({'is_in_shopping_cart': 1}, {self.soup}),
+            (
+                {'is_in_shopping_cart': 0},
+                {self.pancakes, self.bread, self.tea}
+            ),
+            ({'is_favorited': 1, 'is_in_shopping_cart': 0}, {self.pancakes}),
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.get_pks(params),
+                    {recipe.pk for recipe in expected}
+                )
+
+    def test_relations_anonymous(self):
+        client = APIClient()
+        self.assertEqual(self.get_pks({'is_favorited': 1}, client), set())
+        self.assertEqual(
+            len(self.get_pks({'is_in_shopping_cart': 0}, client)), 4
+        )
+
+    def test_tags(self):
+        for tags, expected in (
+            (['breakfast'], {self.pancakes, self.bread}),
+            (['breakfast', 'lunch'], {self.pancakes, self.soup, self.bread}),
+            (['dinner'], set()),
+            (['unknown'], set()),
+        ):
+            with self.subTest(tags=tags):
+                self.assertEqual(
+                    self.get_pks({'tags': tags}),
+                    {recipe.pk for recipe in expected}
+                )
+
+    def test_ingredients(self):
+        for params, expected in (
+            ({'ingredients': f'{self.flour.pk}'}, {self.pancakes, self.bread}),
+            (
+                {'ingredients': f'{self.flour.pk},{self.salt.pk}'},
+                {self.bread}
+            ),
+            (
+                {'exclude_ingredients': f'{self.flour.pk}'},
+                {self.soup, self.tea}
+            ),
+            (
+                {'exclude_ingredients': f'{self.sugar.pk},{self.salt.pk}'},
+                {self.tea}
+            ),
+            (
+                {
+                    'ingredients': f'{self.flour.pk}',
+                    'exclude_ingredients': f'{self.sugar.pk}',
+                },
+                {self.bread}
+            ),
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.get_pks(params),
+                    {recipe.pk for recipe in expected}
+                )
+
+    def test_tags_no_duplicates(self):
+        response = self.client.get(
+            RECIPES_URL, {'tags': ['breakfast', 'lunch'], 'limit': 100}
+        )
+        self.assertEqual(response.data['count'], 3)
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from recipes.tests.utils import create_recipe, create_user
+
+RECIPES_URL = '/api/recipes/'
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = create_user('author')
+        now = timezone.now()
+        # Equal publication dates and counters check tie breakers.
+        for hours, favorites_count, cooking_time in (
+            (1, 3, 20),
+            (2, 0, 10),
+            (2, 3, 10),
+            (2, 1, 30),
+            (3, 0, 10),
+            (4, 3, 5),
+            (4, 0, 20),
+        ):
+            recipe = create_recipe(
+                author,
+                name='Пирог с яблоками',
+                pub_date=now - timedelta(hours=hours),
+                cooking_time=cooking_time
+            )
+            Recipe.objects.filter(pk=recipe.pk).update(
+                favorites_count=favorites_count
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def read_pages(self, params):
+        pks = []
+        response = self.client.get(RECIPES_URL, {**params, 'cursor': ''})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            pks.extend(recipe['id'] for recipe in response.data['results'])
+            if response.data['next'] is None:
+                return pks
+            response = self.client.get(response.data['next'])
+
+    def test_pages(self):
+        for ordering, order_by in (
+            (None, ('-pub_date', '-pk')),
+            ('newest', ('-pub_date', '-pk')),
+            ('popularity', ('-favorites_count', '-pk')),
+            ('cooking_time', ('cooking_time', 'pk')),
+        ):
+            expected = list(
+                Recipe.objects.order_by(*order_by).values_list(
+                    'pk', flat=True
+                )
+            )
+            params = {} if ordering is None else {'ordering': ordering}
+            for limit in (1, 2, 3, 10):
+                with self.subTest(ordering=ordering, limit=limit):
+                    self.assertEqual(
+                        self.read_pages({**params, 'limit': limit}),
+                        expected
+                    )
+
+    def test_page_number_without_cursor(self):
+        response = self.client.get(RECIPES_URL, {'limit': 2, 'page': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 7)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_invalid_cursor(self):
+        for cursor in (
+            'invalid',
+            'WzFd',
+            'eyJhIjogMX0=',
+            'WyJ4IiwgIngiXQ==',
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(RECIPES_URL, {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+    def test_search_falls_back_to_page_number(self):
+        response = self.client.get(
+            RECIPES_URL, {'search': 'пирог', 'cursor': '', 'limit': 3}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 7)
+        self.assertEqual(len(response.data['results']), 3)
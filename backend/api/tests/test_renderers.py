@@ -0,0 +1,113 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+from collections import OrderedDict
+
+from django.test import SimpleTestCase
+from django.utils.functional import lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+DATA = (
+    None,
+    {},
+    [],
+    'строка',
+    {'text': 'line\u2028separator\u2029', 'quote': '"\\/'},
+    {'id': 1, 'name': 'Пирог', 'float': 0.1, 'big': 1e16, 'flag': True},
+    {'nested': [{'a': [1, 2, {'b': None}]}], 'empty': ''},
+    OrderedDict([('b', 1), ('a', 2)]),
+    ReturnDict({'id': 1}, serializer=None),
+    ReturnList([1, 2], serializer=None),
+    {
+        'date': datetime.date(2024, 1, 2),
+        'datetime': datetime.datetime(
+            2024, 1, 2, 3, 4, 5, 678000, tzinfo=datetime.timezone.utc
+        ),
+        'time': datetime.time(3, 4, 5),
+        'timedelta': datetime.timedelta(hours=1),
+        'decimal': decimal.Decimal('1.50'),
+        'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'lazy': lazy(lambda: 'ленивая', str)(),
+        'set': {1},
+        'tuple': (1, 2),
+    },
+    {1: 'integer key'},
+    {'huge': 2 ** 70},
+)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def assertSameJSON(self, data, media_type=None, context=None):
+        expected = JSONRenderer().render(data, media_type, context)
+        rendered = FastJSONRenderer().render(data, media_type, context)
+        if data is None:
+            self.assertEqual(rendered, expected)
+        else:
+            self.assertEqual(json.loads(rendered), json.loads(expected))
+            self.assertNotIn(' '.encode(), rendered)
+            self.assertNotIn(' '.encode(), rendered)
+
+    def test_parity(self):
+        for data in DATA:
+            with self.subTest(data=data):
+                self.assertSameJSON(data)
+
+    def test_compact(self):
+        data = {'a': [1, 'б']}
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_indent(self):
+        data = {'a': [1, 2]}
+        media_type = 'application/json; indent=4'
+        self.assertEqual(
+            FastJSONRenderer().render(data, media_type),
+            JSONRenderer().render(data, media_type)
+        )
+
+
+class FastJSONParserTests(SimpleTestCase):
+
+    def parse(self, parser, content, encoding='utf-8'):
+        return parser.parse(
+            io.BytesIO(content),
+            'application/json',
+            {'encoding': encoding}
+        )
+
+    def test_parity(self):
+        for data in DATA[1:]:
+            content = JSONRenderer().render(data)
+            with self.subTest(content=content):
+                self.assertEqual(
+                    self.parse(FastJSONParser(), content),
+                    self.parse(JSONParser(), content)
+                )
+
+    def test_other_encoding(self):
+        content = '{"name": "Пирог"}'.encode('utf-16')
+        self.assertEqual(
+            self.parse(FastJSONParser(), content, 'utf-16'),
+            {'name': 'Пирог'}
+        )
+
+    def test_invalid(self):
+        for content in (b'', b'{', b'{"a": NaN', b'\xff'):
+            with self.subTest(content=content):
+                with self.assertRaises(ParseError) as expected:
+                    self.parse(JSONParser(), content)
+                with self.assertRaises(ParseError) as parsed:
+                    self.parse(FastJSONParser(), content)
+                self.assertEqual(
+                    str(parsed.exception), str(expected.exception)
+                )
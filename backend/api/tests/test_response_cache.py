@@ -0,0 +1,120 @@
+import tempfile
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api import response_cache
+from recipes.models import Ingredient, Tag
+from recipes.tests.utils import (
+    create_ingredient,
+    create_recipe,
+    create_tag,
+    create_user,
+)
+
+TAGS_URL = '/api/tags/'
+
+
+class ResponseCacheTests(TestCase):
+    """Responses are cached in file based cache shared by processes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.tag = create_tag('breakfast')
+        cls.ingredient = create_ingredient('мука')
+        cls.recipe = create_recipe(
+            cls.author, tags=(cls.tag,), ingredients=(cls.ingredient,)
+        )
+        cls.recipe_url = f'/api/recipes/{cls.recipe.pk}/'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        caches_override = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': directory.name,
+        }})
+        caches_override.enable()
+        self.addCleanup(caches_override.disable)
+        self.client = APIClient()
+
+    def get(self, url, queries=None, client=None):
+        client = client or self.client
+        if queries is None:
+            response = client.get(url)
+        else:
+            with self.assertNumQueries(queries):
+                response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def change(self, function):
+        with self.captureOnCommitCallbacks(execute=True):
+            function()
+
+    def test_process_local_cache_disabled(self):
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}):
+            self.assertFalse(response_cache.enabled())
+        self.assertTrue(response_cache.enabled())
+
+    def test_hit(self):
+        data = self.get(TAGS_URL)
+        self.assertEqual(self.get(TAGS_URL, queries=0), data)
+        self.assertEqual(self.get(self.recipe_url), self.get(
+            self.recipe_url, queries=0
+        ))
+
+    def test_tag_change(self):
+        self.get(TAGS_URL)
+        self.get(self.recipe_url)
+        tag = Tag.objects.get(pk=self.tag.pk)
+        tag.name = 'Завтрак'
+        self.change(tag.save)
+        self.assertEqual(self.get(TAGS_URL)[0]['name'], 'Завтрак')
+        self.assertEqual(
+            self.get(self.recipe_url)['tags'][0]['name'], 'Завтрак'
+        )
+
+    def test_ingredient_change(self):
+        url = f'/api/ingredients/{self.ingredient.pk}/'
+        self.get(url)
+        self.get(self.recipe_url)
+        ingredient = Ingredient.objects.get(pk=self.ingredient.pk)
+        ingredient.measurement_unit = 'кг'
+        self.change(ingredient.save)
+        self.assertEqual(self.get(url)['measurement_unit'], 'кг')
+        self.assertEqual(
+            self.get(self.recipe_url)['ingredients'][0]['measurement_unit'],
+            'кг'
+        )
+
+    def test_recipe_change(self):
+        self.get(self.recipe_url)
+        self.recipe.name = 'Блины'
+        self.change(self.recipe.save)
+        self.assertEqual(self.get(self.recipe_url)['name'], 'Блины')
+        other = create_tag('lunch')
+        self.change(lambda: self.recipe.tags.add(other))
+        self.assertEqual(len(self.get(self.recipe_url)['tags']), 2)
+
+    def test_author_change(self):
+        self.get(self.recipe_url)
+        self.author.first_name = 'Иван'
+        self.change(self.author.save)
+        self.assertEqual(
+            self.get(self.recipe_url)['author']['first_name'], 'Иван'
+        )
+
+    def test_authenticated_not_cached(self):
+        self.get(self.recipe_url)
+        client = APIClient()
+        client.force_authenticate(self.author)
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get(self.recipe_url, client=client)
+        self.assertTrue(queries.captured_queries)
+        self.assertFalse(data['is_favorited'])
@@ -0,0 +1,67 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.recipes.serializers import RecipeSerializer
+from recipes.tests.utils import (
+    create_ingredient,
+    create_recipe,
+    create_tag,
+    create_user,
+)
+
+RECIPES_URL = '/api/recipes/'
+
+
+class SparseFieldsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.author = create_user('author')
+        cls.recipe = create_recipe(
+            cls.author,
+            tags=(create_tag('breakfast'),),
+            ingredients=(create_ingredient('мука'),)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(queries)
+
+    def test_fields(self):
+        for params, expected in (
+            ({}, set(RecipeSerializer.Meta.fields)),
+            ({'fields': 'id,name'}, {'id', 'name'}),
+            ({'fields': 'id, name, unknown'}, {'id', 'name'}),
+            (
+                {'omit': 'text,author,tags'},
+                set(RecipeSerializer.Meta.fields) - {'text', 'author', 'tags'}
+            ),
+            ({'fields': 'id,name', 'omit': 'name'}, {'id'}),
+        ):
+            with self.subTest(params=params):
+                data, _ = self.get(f'{RECIPES_URL}{self.recipe.pk}/', params)
+                self.assertEqual(set(data), expected)
+                data, _ = self.get(RECIPES_URL, params)
+                self.assertEqual(set(data['results'][0]), expected)
+
+    def test_nested_serializers_keep_fields(self):
+        data, _ = self.get(
+            f'{RECIPES_URL}{self.recipe.pk}/', {'fields': 'id,author,tags'}
+        )
+        self.assertIn('email', data['author'])
+        self.assertIn('slug', data['tags'][0])
+
+    def test_fewer_queries(self):
+        _, all_queries = self.get(RECIPES_URL, {})
+        _, queries = self.get(RECIPES_URL, {'fields': 'id,name'})
+        self.assertLess(queries, all_queries)
+        self.assertEqual(queries, 2)
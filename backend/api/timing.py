@@ -0,0 +1,132 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+_current_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Performance measurements of one request.
+
+    Collects database time and queries (through
+    `connection.execute_wrapper`) and named spans. Every span keeps its
+    wall time and database time spent inside it. SQL text without
+    parameters of the first `max_queries` queries is kept in `sql`,
+    queries longer than `slow_query_ms` are kept in `slow_queries`.
+    """
+
+    def __init__(self, max_queries=0, slow_query_ms=None):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.db = 0.0
+        self.queries = 0
+        self.spans = {}
+        self.sql = []
+        self.max_queries = max_queries
+        self.slow_query_ms = slow_query_ms
+        self.slow_queries = []
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.db += elapsed
+            self.queries += 1
+            if len(self.sql) < self.max_queries:
+                self.sql.append((sql, elapsed))
+            if (self.slow_query_ms is not None
+                    and elapsed * 1000 >= self.slow_query_ms):
+                self.slow_queries.append((sql, params, many, elapsed))
+
+    @contextmanager
+    def span(self, name):
+        if name in self.spans:
+            yield
+            return
+        self.spans[name] = None
+        started = time.perf_counter()
+        db_started = self.db
+        try:
+            yield
+        finally:
+            self.spans[name] = (
+                time.perf_counter() - started,
+                self.db - db_started,
+            )
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def span_time(self, name, exclude_db=False):
+        wall, db = self.spans.get(name) or (0.0, 0.0)
+        return wall - db if exclude_db else wall
+
+    def metrics(self):
+        """
+        Return dictionary with request timings in milliseconds.
+
+        * total - whole request;
+        * db - database queries;
+        * app - views and serializers code without database queries;
+        * other - routing, middlewares and response rendering;
+        * pdf - PDF files rendering, included in app time.
+        """
+        return {
+            'total': self.total * 1000,
+            'db': self.db * 1000,
+            'app': self.span_time('view', exclude_db=True) * 1000,
+            'other': (
+                self.total - self.span_time('view')
+                if 'view' in self.spans else 0.0
+            ) * 1000,
+            'pdf': self.span_time('pdf') * 1000,
+        }
+
+    def server_timing(self):
+        """Return `Server-Timing` header value."""
+        metrics = []
+        for name, duration in self.metrics().items():
+            if name == 'db':
+                metrics.append(
+                    f'db;dur={duration:.2f};desc="{self.queries} queries"'
+                )
+            elif duration or name == 'total':
+                metrics.append(f'{name};dur={duration:.2f}')
+        return ', '.join(metrics)
+
+
+def start(max_queries=0, slow_query_ms=None):
+    """Start measurements of the current request."""
+    timings = RequestTimings(max_queries, slow_query_ms)
+    return timings, _current_timings.set(timings)
+
+
+def stop(token):
+    _current_timings.reset(token)
+
+
+def current():
+    """Return measurements of the current request or None."""
+    return _current_timings.get()
+
+
+@contextmanager
+def span(name):
+    """Measure code block as named span of the current request."""
+    timings = current()
+    if timings is None:
+        yield
+        return
+    with timings.span(name):
+        yield
+
+
+class ServerTimingMixin:
+    """ViewSet mixin measuring views and serializers time."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with span('view'):
+            return super().dispatch(request, *args, **kwargs)
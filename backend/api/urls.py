@@ -1,8 +1,11 @@
 from django.urls import include, path
 
+from .views import MetricsView
+
 app_name = 'api-v1'
 
 urlpatterns = [
     path('', include('api.recipes.urls')),
     path('', include('api.users.urls')),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
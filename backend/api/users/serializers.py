@@ -3,13 +3,14 @@ from djoser.serializers import UserCreateSerializer
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
+from api.sparse_fields import SparseFieldsMixin
 from foodgram_backend import constants
 from users.models import Subscription
 
 User = get_user_model()
 
 
-class CustomUserSerializer(serializers.ModelSerializer):
+class CustomUserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     User model serializer.
 
@@ -21,6 +22,8 @@ class CustomUserSerializer(serializers.ModelSerializer):
     * last_name;
     * is_subscribed (read only) - custom field, if current user
     subscribed on specified user.
+
+    Fields can be selected by `fields` and `omit` query parameters.
     """
 
     is_subscribed = serializers.SerializerMethodField()
@@ -37,6 +40,8 @@ class CustomUserSerializer(serializers.ModelSerializer):
         )
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         user = self.context['request'].user
         return (user.is_authenticated
                 and user.subscriptions.filter(subscription=obj).exists())
@@ -77,11 +82,10 @@ class UserSubscriberSerializer(CustomUserSerializer):
     * is_subscribed (read only) - custom field, if current user
     subscribed on specified user.
     * recipes (read only) - user recipes, many;
-    * recipes_count (read only) - custom field.
+    * recipes_count (read only) - denormalized counter.
     """
     from api.recipes.serializers import RecipeSimpleSerializer
 
-    recipes_count = serializers.SerializerMethodField()
     recipes = RecipeSimpleSerializer(
         many=True,
         read_only=True
@@ -100,9 +104,6 @@ class UserSubscriberSerializer(CustomUserSerializer):
             'recipes_count',
         )
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
-
 
 class SubscriptionSerializer(serializers.ModelSerializer):
     """
@@ -1,21 +1,26 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
 from djoser.views import UserViewSet
 from rest_framework import permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from .serializers import SubscriptionSerializer
+from api.sparse_fields import requested_fields
+from api.timing import ServerTimingMixin
 from foodgram_backend import constants
 from users.models import Subscription
 
 User = get_user_model()
 
 
-class CustomUserViewSet(UserViewSet):
+class CustomUserViewSet(ServerTimingMixin, UserViewSet):
     """
     User model ViewSet.
 
-    Include create, list and retrive generic methods.
+    Include create, list and retrive generic methods. List and retrieve
+    don't check subscriptions if `is_subscribed` field is omitted by
+    `fields` or `omit` query parameters.
 
     Methods
     -------
@@ -25,6 +30,25 @@ class CustomUserViewSet(UserViewSet):
         Add or remove subscription to specified user.
     """
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if (self.action not in ('list', 'retrieve')
+                or not user.is_authenticated):
+            return queryset
+        fields = requested_fields(
+            self.request,
+            self.get_serializer_class().Meta.fields
+        )
+        if 'is_subscribed' not in fields:
+            return queryset
+        return queryset.annotate(is_subscribed=Exists(
+            Subscription.objects.filter(
+                user=user.pk,
+                subscription=OuterRef('pk')
+            )
+        ))
+
     @action(
         ['get'],
         detail=False,
@@ -36,7 +60,7 @@ class CustomUserViewSet(UserViewSet):
 
         Get method. Availible only to authenticated users.
         """
-        queryset = request.user.subscriptions.all()
+        queryset = request.user.subscriptions.select_related('subscription')
         page = self.paginate_queryset(queryset)
         serializer = SubscriptionSerializer(
             page,
@@ -1,5 +1,12 @@
+import hashlib
 import io
+import json
+import math
+import mimetypes
+import os
 import re
+import tempfile
+import time
 from decimal import Decimal
 from pathlib import Path
 
@@ -8,11 +15,20 @@ from borb.io.write.any_object_transformer import AnyObjectTransformer
 from borb.io.write.transformer import WriteTransformerState
 from borb.pdf import Alignment
 from borb.pdf.canvas.font.simple_font.true_type_font import TrueTypeFont
+from django.conf import settings
 from django.contrib.staticfiles import finders
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+
+from api import metrics, timing
 
 FORMAT_STRING = '• {name} ({measurement_unit}) - {amount_sum}'
 SPLIT_REGEX = re.compile('(?<=.)(?=[A-Z])')
 FONT_FILE = 'fonts/arialnova_light.ttf'
+SHOPPING_LISTS_DIR = 'shopping_lists'
+# Files being written, left only by crashed renders after this age.
+TEMP_SUFFIX = '.pdf.tmp'
+TEMP_MAX_AGE = 3600
 
 
 def save_pdf(file, document):
@@ -75,6 +91,170 @@ def get_pdf(ingredients, format_string=None, font_path=None):
     return buffer
 
 
+def percentile(values, percent):
+    """Return percentile of values by nearest-rank method."""
+    values = sorted(values)
+    if not values:
+        return 0
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
 def class_name(name):
     """Split class name by capital latters."""
     return ' '.join(re.split(SPLIT_REGEX, name))
+
+
+def get_cached_pdf(ingredients, format_string=None):
+    """
+    Return path to PDF file with ingredients list.
+
+    File name is a digest of the ingredients list, so the same shopping
+    list is rendered only once and then reused from
+    `PRIVATE_MEDIA_ROOT`. Modification time of reused file is updated,
+    so `prune_cached_pdfs` evicts least recently used files.
+
+    Parameters
+    ----------
+    ingredients : iterable
+        List with ingredients dictionaries, see `get_pdf`.
+    format_string : str
+        Format string to represent ingredients as text list items.
+
+    Returns
+    -------
+    Path
+        Path to PDF file.
+    """
+    if format_string is None:
+        format_string = FORMAT_STRING
+    ingredients = list(ingredients)
+    digest = hashlib.sha256(
+        json.dumps(
+            [format_string, FONT_FILE, ingredients],
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        ).encode()
+    ).hexdigest()
+    directory = Path(settings.PRIVATE_MEDIA_ROOT) / SHOPPING_LISTS_DIR
+    path = directory / f'{digest}.pdf'
+    if path.exists():
+        metrics.inc('foodgram_cache_requests_total', cache='pdf', result='hit')
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        else:
+            return path
+    metrics.inc('foodgram_cache_requests_total', cache='pdf', result='miss')
+    directory.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    with timing.span('pdf'):
+        pdf_buffer = get_pdf(ingredients, format_string)
+    metrics.observe(
+        'foodgram_pdf_render_duration_seconds',
+        time.perf_counter() - started
+    )
+    with tempfile.NamedTemporaryFile(
+        dir=directory, suffix=TEMP_SUFFIX, delete=False
+    ) as file:
+        file.write(pdf_buffer.getbuffer())
+    os.replace(file.name, path)
+    return path
+
+
+def prune_cached_pdfs(max_age, max_files=None):
+    """
+    Remove cached shopping list PDF files.
+
+    Temporary files older than `TEMP_MAX_AGE` seconds, left by renders
+    interrupted before file was moved into place, are removed too.
+
+    Parameters
+    ----------
+    max_age : float
+        Files not used for more than `max_age` seconds are removed.
+    max_files : int
+        Maximum number of kept files, least recently used files above it
+        are removed. By default not limited.
+
+    Returns
+    -------
+    int
+        Number of removed files.
+    """
+    directory = Path(settings.PRIVATE_MEDIA_ROOT) / SHOPPING_LISTS_DIR
+    removed = 0
+    for path in directory.glob(f'*{TEMP_SUFFIX}'):
+        try:
+            if path.stat().st_mtime < time.time() - TEMP_MAX_AGE:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    files = []
+    for path in directory.glob('*.pdf'):
+        try:
+            files.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue
+    files.sort(reverse=True)
+    oldest = time.time() - max_age
+    for number, (used, path) in enumerate(files):
+        if used >= oldest and (max_files is None or number < max_files):
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        removed += 1
+    return removed
+
+
+def send_file(request, path, filename, as_attachment=True):
+    """
+    Return response with private file.
+
+    With `X_ACCEL_REDIRECT` setting enabled file transfer is handed over
+    to nginx by `X-Accel-Redirect` header, so Django only makes access
+    decisions. Otherwise file is streamed with `FileResponse`.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        Current request, used for conditional GET.
+    path : Path
+        Path to file inside `PRIVATE_MEDIA_ROOT`.
+    filename : str
+        File name for Content-Disposition header.
+    as_attachment : bool
+        Content-Disposition type. By default True.
+
+    Returns
+    -------
+    HttpResponse
+    """
+    path = Path(path)
+    etag = f'"{path.stem}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    if not settings.X_ACCEL_REDIRECT:
+        response = FileResponse(
+            path.open('rb'), as_attachment=as_attachment, filename=filename
+        )
+    else:
+        content_type, _ = mimetypes.guess_type(filename)
+        response = HttpResponse(
+            content_type=content_type or 'application/octet-stream'
+        )
+        disposition = 'attachment' if as_attachment else 'inline'
+        response['Content-Disposition'] = (
+            f'{disposition}; filename="{filename}"'
+        )
+        response['X-Accel-Redirect'] = settings.PRIVATE_MEDIA_URL + str(
+            path.relative_to(settings.PRIVATE_MEDIA_ROOT).as_posix()
+        )
+    response['ETag'] = etag
+    return response
@@ -0,0 +1,21 @@
+from django.http import HttpResponse
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+from api import metrics
+
+
+class MetricsView(APIView):
+    """
+    Prometheus metrics of all worker processes.
+
+    Get method. Availible only to administrators.
+    """
+
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        return HttpResponse(
+            metrics.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
@@ -18,3 +18,6 @@ REMOVE_ERROR_MESSAGE = 'Рецепта нет в {}'
 RECIPE_DOES_NOT_EXIST = 'Рецепт не существует'
 COOKING_TIME_ERROR = 'Время приготовления должно быть не меньше 1'
 AMOUNT_ERROR = 'Количество должно быть не меньше 1'
+SIMILARITY_KIND_ERROR = 'Неизвестный тип похожих рецептов'
+RECIPE_IDS_ERROR = 'Укажите список целых id рецептов через запятую'
+RECIPE_IDS_LIMIT_ERROR = 'Можно запросить не больше {} рецептов'
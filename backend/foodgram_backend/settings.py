@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,6 +29,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.ServerTimingMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,6 +80,27 @@ else:
         }
     }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 10000)),
+        },
+    }
+}
+
+# Cached API responses (tags, ingredients, anonymous recipe cards).
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300))
+
+# API responses compression, brotli is used if installed.
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -110,6 +134,16 @@ STATIC_ROOT = BASE_DIR / 'collected_static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Files available only through API views, e.g. generated shopping lists.
+PRIVATE_MEDIA_URL = '/protected/'
+PRIVATE_MEDIA_ROOT = BASE_DIR / 'private'
+# Cached shopping lists not downloaded for this time are removed by
+# cleanshoppinglists command.
+SHOPPING_LIST_TTL_HOURS = float(os.getenv('SHOPPING_LIST_TTL_HOURS', 168))
+
+# Hand over private files transfer to nginx by X-Accel-Redirect header.
+X_ACCEL_REDIRECT = bool(int(os.getenv('X_ACCEL_REDIRECT', False)))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.CustomUser'
@@ -118,11 +152,26 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageNumberLimitPagination',
     'PAGE_SIZE': 6,
 
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
 }
 
+# Token lookups cache: per-worker LRU and optional shared cache alias.
+TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', 60))
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 10000))
+TOKEN_CACHE_ALIAS = os.getenv('TOKEN_CACHE_ALIAS')
+
 DJOSER = {
     'LOGIN_FIELD': 'email',
     'SERIALIZERS': {
@@ -136,3 +185,76 @@ DJOSER = {
     },
     'HIDE_USERS': False,
 }
+
+# API requests performance measurements.
+API_PREFIX = '/api/'
+# Timings reveal database load, so by default they are sent only in debug.
+SERVER_TIMING = bool(int(os.getenv('SERVER_TIMING', DEBUG)))
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 500))
+SLOW_REQUEST_SAMPLE_RATE = float(os.getenv('SLOW_REQUEST_SAMPLE_RATE', 1))
+# SQL text of slow requests is logged only on demand, query parameters
+# (password hashes, token keys) are never logged.
+SLOW_REQUEST_SQL = bool(int(os.getenv('SLOW_REQUEST_SQL', False)))
+SLOW_REQUEST_MAX_QUERIES = int(os.getenv('SLOW_REQUEST_MAX_QUERIES', 100))
+
+# Save queries slower than SLOW_QUERY_MS with their plans, see admin site.
+SLOW_QUERY_LOG = bool(int(os.getenv('SLOW_QUERY_LOG', False)))
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv('SLOW_QUERY_EXPLAIN_RATE', 1))
+SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', 1000))
+
+# Metrics files of all worker processes, exposed at /api/metrics/.
+METRICS_DIR = os.getenv(
+    'METRICS_DIR', Path(tempfile.gettempdir()) / 'foodgram_metrics'
+)
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+
+# Subscription feed: recipes of authors with up to FEED_FANOUT_LIMIT
+# followers are copied to followers timelines after publish commit, so the
+# limit bounds the work of publishing request. Recipes of authors with more
+# followers are read directly from recipes table.
+FEED_MAX_ENTRIES = int(os.getenv('FEED_MAX_ENTRIES', 1000))
+FEED_FANOUT_LIMIT = int(os.getenv('FEED_FANOUT_LIMIT', 500))
+FEED_BATCH_SIZE = 1000
+
+# Trending recipes: favorites and cart adds of the last TRENDING_WINDOW_DAYS
+# with weight halved every TRENDING_HALF_LIFE_HOURS.
+TRENDING_SIZE = int(os.getenv('TRENDING_SIZE', 100))
+TRENDING_WINDOW_DAYS = int(os.getenv('TRENDING_WINDOW_DAYS', 7))
+TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS', 24))
+TRENDING_CART_WEIGHT = 0.5
+
+# Number of similar recipes stored for every recipe.
+SIMILAR_RECIPES_COUNT = int(os.getenv('SIMILAR_RECIPES_COUNT', 10))
+# Recipes with the most common ingredients compared on recipe change.
+SIMILARITY_CANDIDATES = int(os.getenv('SIMILARITY_CANDIDATES', 200))
+# Newest recipes read per ingredient for candidates, ingredients of more
+# recipes are skipped as too common.
+SIMILARITY_MAX_POSTINGS = int(os.getenv('SIMILARITY_MAX_POSTINGS', 500))
+# Update ingredients based similar recipes after recipe save, otherwise
+# only by buildsimilarrecipes command.
+SIMILARITY_UPDATE_ON_SAVE = bool(
+    int(os.getenv('SIMILARITY_UPDATE_ON_SAVE', 0))
+)
+
+# Maximum number of recipes returned by one batch request.
+RECIPES_BATCH_SIZE = int(os.getenv('RECIPES_BATCH_SIZE', 100))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.performance': {
+            'handlers': ['console'],
+            'level': os.getenv(
+                'PERFORMANCE_LOG_LEVEL', 'INFO' if DEBUG else 'WARNING'
+            ),
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,15 @@
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram_backend.settings')
+
+
+def on_starting(server):
+    """Merge metrics files left by workers of previous runs."""
+    from api import metrics
+    metrics.mark_process_dead()
+
+
+def child_exit(server, worker):
+    """Merge metrics file of finished worker."""
+    from api import metrics
+    metrics.mark_process_dead(worker.pid)
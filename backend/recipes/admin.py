@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from . import similarity
 from .models import (
     Favorite,
     Ingredient,
@@ -57,6 +58,7 @@ class RecipeAdmin(admin.ModelAdmin):
         'name',
         'author',
         'favorites_count',
+        'in_carts_count',
     )
     list_filter = (
         'author',
@@ -74,17 +76,20 @@ class RecipeAdmin(admin.ModelAdmin):
     )
     readonly_fields = (
         'favorites_count',
+        'in_carts_count',
     )
 
-    @admin.display(description='Избранное')
-    def favorites_count(self, instance):
-        return instance.favorings.count()
-
     def get_readonly_fields(self, request, obj=None):
         if obj:
             return self.readonly_fields
         return ()
 
+    def save_related(self, request, form, formsets, change):
+        features = similarity.features(form.instance.pk) if change else None
+        super().save_related(request, form, formsets, change)
+        if similarity.features(form.instance.pk) != features:
+            similarity.update_after_commit(form.instance.pk)
+
 
 @admin.register(RecipeIngredient)
 class RecipeIngredientAdmin(admin.ModelAdmin):
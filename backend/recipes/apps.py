@@ -6,3 +6,6 @@ class RecipesConfig(AppConfig):
     name = 'recipes'
     verbose_name = 'Рецепты'
     verbose_name_plural = 'Рецепты'
+
+    def ready(self):
+        from recipes import signals  # noqa: F401
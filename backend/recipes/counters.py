@@ -0,0 +1,135 @@
+from django.apps import apps as global_apps
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# (model, counter field, counted model, counted model foreign key)
+COUNTERS = (
+    ('recipes.Recipe', 'favorites_count', 'recipes.Favorite', 'recipe'),
+    ('recipes.Recipe', 'in_carts_count', 'recipes.ShoppingCart', 'recipe'),
+    ('users.CustomUser', 'recipes_count', 'recipes.Recipe', 'author'),
+    (
+        'users.CustomUser',
+        'subscribers_count',
+        'users.Subscription',
+        'subscription'
+    ),
+)
+DEFAULT_BATCH_SIZE = 1000
+
+
+class CountersMixin:
+    """
+    Model mixin excluding counter fields from saves of existing objects.
+
+    Counters are changed only by `F()` updates, so `save()` of instance
+    loaded earlier doesn't write back outdated values. Deferred fields
+    are not saved too, like by plain `save()`.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key
+                    and field.attname not in deferred
+                ]
+            kwargs['update_fields'] = [
+                name for name in update_fields
+                if name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+def increment(model, pk, field):
+    """Atomically increase counter field of object."""
+    model.objects.filter(pk=pk).update(**{field: F(field) + 1})
+
+
+def decrement(model, pk, field):
+    """Atomically decrease counter field of object, not below zero."""
+    model.objects.filter(
+        pk=pk, **{f'{field}__gt': 0}
+    ).update(**{field: F(field) - 1})
+
+
+def checked_batches(queryset, batch_size, pks=None):
+    """
+    Yield batches of `(pk, current, actual)` rows in primary key order.
+
+    Without `pks` whole table is read by keyset pagination, otherwise
+    only objects with given primary keys are read.
+    """
+    if pks is not None:
+        pks = sorted(set(pks))
+        for start in range(0, len(pks), batch_size):
+            yield list(queryset.filter(pk__in=pks[start:start + batch_size]))
+        return
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1][0]
+        yield batch
+
+
+def reconcile(apps=global_apps, batch_size=DEFAULT_BATCH_SIZE, pks=None):
+    """
+    Recount counter fields and fix drifted values.
+
+    Objects are checked in primary key order by batches of
+    `batch_size`, only objects with wrong counters are updated.
+
+    Parameters
+    ----------
+    apps : Apps
+        Application registry, historical one in migrations.
+    batch_size : int
+        Number of objects checked by one query.
+    pks : dict
+        Primary keys of checked objects by model label, like
+        'recipes.Recipe'. Counters of models missing in it are not
+        checked. By default all objects are checked.
+
+    Returns
+    -------
+    dict
+        Number of fixed objects by counter name.
+    """
+    fixed = {}
+    for model_name, field, counted_name, foreign_key in COUNTERS:
+        if pks is not None and model_name not in pks:
+            continue
+        model = apps.get_model(model_name)
+        counted = apps.get_model(counted_name)
+        actual = Coalesce(Subquery(
+            counted.objects.filter(
+                **{foreign_key: OuterRef('pk')}
+            ).order_by().values(
+                foreign_key
+            ).annotate(
+                total=Count('pk')
+            ).values('total')
+        ), 0)
+        name = f'{model._meta.label}.{field}'
+        fixed[name] = 0
+        queryset = model.objects.order_by('pk').annotate(
+            actual=actual
+        ).values_list('pk', field, 'actual')
+        for batch in checked_batches(
+            queryset,
+            batch_size,
+            None if pks is None else pks[model_name]
+        ):
+            drifted = [
+                model(pk=pk, **{field: value})
+                for pk, current, value in batch if current != value
+            ]
+            model.objects.bulk_update(drifted, (field,))
+            fixed[name] += len(drifted)
+    return fixed
@@ -0,0 +1,217 @@
+import heapq
+import itertools
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q
+
+from recipes.management.utils import batched
+from recipes.models import Recipe, TimelineEntry
+from users.models import Subscription
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+
+def is_fanout_author(author_id):
+    """Check if author recipes are copied to followers timelines."""
+    return not User.objects.filter(
+        pk=author_id,
+        subscribers_count__gt=settings.FEED_FANOUT_LIMIT
+    ).exists()
+
+
+def trim(user_ids):
+    """Keep only `FEED_MAX_ENTRIES` newest entries in users timelines."""
+    limit = settings.FEED_MAX_ENTRIES
+    overflowing = TimelineEntry.objects.filter(
+        user__in=user_ids
+    ).values(
+        'user'
+    ).annotate(
+        entries_count=Count('pk')
+    ).filter(
+        entries_count__gt=limit
+    ).values_list('user', flat=True)
+    for user_id in overflowing:
+        TimelineEntry.objects.filter(pk__in=list(
+            TimelineEntry.objects.filter(
+                user=user_id
+            ).order_by(
+                '-pub_date', '-recipe_id'
+            ).values_list('pk', flat=True)[limit:]
+        )).delete()
+
+
+def create_entries(entries):
+    TimelineEntry.objects.bulk_create(
+        entries,
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def fanout(recipe):
+    """
+    Add new recipe to timelines of author followers.
+
+    Followers are processed in batches of `FEED_BATCH_SIZE`. Recipes of
+    authors with more than `FEED_FANOUT_LIMIT` followers are not copied.
+    Timelines are not trimmed here, reads are bounded by index anyway and
+    old entries are removed by `rebuildfeeds --trim`.
+    """
+    if not is_fanout_author(recipe.author_id):
+        return
+    followers = Subscription.objects.filter(
+        subscription=recipe.author_id
+    ).order_by('pk').values_list('user', flat=True)
+    for batch in batched(
+        followers.iterator(chunk_size=settings.FEED_BATCH_SIZE),
+        settings.FEED_BATCH_SIZE
+    ):
+        create_entries([
+            TimelineEntry(
+                user_id=user_id,
+                recipe_id=recipe.pk,
+                author_id=recipe.author_id,
+                pub_date=recipe.pub_date
+            )
+            for user_id in batch
+        ])
+
+
+def follow(user_id, author_id):
+    """Add latest author recipes to new follower timeline."""
+    if not is_fanout_author(author_id):
+        return
+    create_entries([
+        TimelineEntry(
+            user_id=user_id,
+            recipe_id=recipe_id,
+            author_id=author_id,
+            pub_date=pub_date
+        )
+        for recipe_id, pub_date in Recipe.objects.filter(
+            author=author_id
+        ).order_by(
+            '-pub_date'
+        ).values_list('pk', 'pub_date')[:settings.FEED_MAX_ENTRIES]
+    ])
+    trim([user_id])
+
+
+def unfollow(user_id, author_id):
+    TimelineEntry.objects.filter(user=user_id, author=author_id).delete()
+
+
+def rebuild(user_ids):
+    """Fill timelines of given users from their subscriptions."""
+    for user_id in user_ids:
+        TimelineEntry.objects.filter(user=user_id).delete()
+        authors = Subscription.objects.filter(
+            user=user_id,
+            subscription__subscribers_count__lte=settings.FEED_FANOUT_LIMIT
+        ).values('subscription')
+        create_entries([
+            TimelineEntry(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                author_id=author_id,
+                pub_date=pub_date
+            )
+            for recipe_id, author_id, pub_date in Recipe.objects.filter(
+                author__in=authors
+            ).order_by(
+                '-pub_date'
+            ).values_list(
+                'pk', 'author', 'pub_date'
+            )[:settings.FEED_MAX_ENTRIES]
+        ])
+
+
+def after_commit(function, *args):
+    """
+    Call timeline update after transaction commit.
+
+    Errors are logged instead of raised, so committed request doesn't
+    fail, timelines can be fixed by `rebuildfeeds` command.
+    """
+    def call():
+        try:
+            function(*args)
+        except Exception:
+            logger.exception(
+                'Timeline update %s%r failed', function.__name__, args
+            )
+    transaction.on_commit(call)
+
+
+class Feed:
+    """
+    Recipes of authors followed by user, newest first.
+
+    Page after (pub_date, pk) position reads only page size items after
+    it from user timeline by (user, -pub_date) index and from every
+    followed author with too many followers by (author, -pub_date)
+    index, merges them and loads recipes of the page from `queryset`.
+    """
+
+    def __init__(self, queryset, user):
+        self.queryset = queryset
+        self.user = user
+        self.popular_authors = list(Subscription.objects.filter(
+            user=user,
+            subscription__subscribers_count__gt=settings.FEED_FANOUT_LIMIT
+        ).values_list('subscription', flat=True))
+
+    def sources(self, position, size):
+        """
+        Return lists of (recipe pk, pub_date) after position, newest first.
+
+        Timeline entries of popular authors left from the time they had
+        fewer followers are skipped, their recipes are read directly.
+        """
+        timeline_after = recipes_after = Q()
+        if position is not None:
+            pub_date, pk = position
+            timeline_after = Q(pub_date__lt=pub_date) | Q(
+                pub_date=pub_date, recipe_id__lt=pk
+            )
+            recipes_after = Q(pub_date__lt=pub_date) | Q(
+                pub_date=pub_date, pk__lt=pk
+            )
+        yield list(TimelineEntry.objects.filter(
+            timeline_after,
+            user=self.user
+        ).exclude(
+            author__in=self.popular_authors
+        ).order_by(
+            '-pub_date', '-recipe_id'
+        ).values_list('recipe_id', 'pub_date')[:size])
+        for author_id in self.popular_authors:
+            yield list(Recipe.objects.filter(
+                recipes_after,
+                author=author_id
+            ).order_by(
+                '-pub_date', '-pk'
+            ).values_list('pk', 'pub_date')[:size])
+
+    def page(self, position, size):
+        """Return up to `size` recipes after (pub_date, pk) position."""
+        pks = [
+            pk for pk, _ in itertools.islice(heapq.merge(
+                *self.sources(position, size),
+                key=lambda item: (item[1], item[0]),
+                reverse=True
+            ), size)
+        ]
+        recipes = self.queryset.in_bulk(pks)
+        return [recipes[pk] for pk in pks if pk in recipes]
+
+
+def feed(queryset, user):
+    """Return recipes of user subscriptions by pages, newest first."""
+    return Feed(queryset, user)
@@ -0,0 +1,57 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from recipes import similarity
+from recipes.models import RecipeSimilarity
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит списки похожих рецептов по совместному добавлению '
+        'в избранное и по общим ингредиентам и тегам'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--kind',
+            choices=dict(RecipeSimilarity.KINDS),
+            action='append',
+            help='Тип похожих рецептов, по умолчанию все.'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=settings.SIMILAR_RECIPES_COUNT,
+            help='Количество похожих рецептов для каждого рецепта.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            help='Количество рецептов, обрабатываемых за один шаг, по '
+                 f'умолчанию {similarity.CHUNK_SIZE} для избранного и '
+                 f'{similarity.CONTENT_CHUNK_SIZE} для ингредиентов.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options['top'] < 1 or (
+            options['chunk_size'] is not None and options['chunk_size'] < 1
+        ):
+            raise CommandError('--top and --chunk-size must be positive')
+        kinds = options['kind'] or dict(RecipeSimilarity.KINDS)
+        builders = {
+            RecipeSimilarity.FAVORITES: similarity.build_favorites,
+            RecipeSimilarity.INGREDIENTS: similarity.build_ingredients,
+        }
+        if not similarity.available():
+            raise CommandError('numpy and scipy are required')
+        for kind in kinds:
+            saved = builders[kind](options['top'], options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Successfully saved {saved} similar recipes by {kind}'
+            ))
@@ -0,0 +1,103 @@
+import json
+from typing import Any
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from recipes.management.utils import batched
+from recipes.models import Recipe, RecipeIngredient
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Экспортирует рецепты в файл формата JSON Lines'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            'file',
+            nargs='?',
+            default='-',
+            help='Файл для записи, по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество рецептов, загружаемых за один запрос.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        if options['file'] == '-':
+            self.export(self.stdout, options['batch_size'])
+            return
+        try:
+            with open(options['file'], 'w', encoding='utf-8') as file:
+                exported = self.export(file, options['batch_size'])
+        except OSError as error:
+            raise CommandError(error)
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully exported {exported} recipes')
+        )
+
+    def export(self, file, batch_size):
+        """
+        Write recipes to file, one JSON object per line.
+
+        Recipes are read by server-side cursor, their tags and ingredients
+        are loaded with one query per batch.
+        """
+        recipes = Recipe.objects.order_by('pk').values(
+            'pk',
+            'name',
+            'text',
+            'cooking_time',
+            'image',
+            'pub_date',
+            'author__email',
+        ).iterator(chunk_size=batch_size)
+        exported = 0
+        for batch in batched(recipes, batch_size):
+            recipe_pks = [recipe['pk'] for recipe in batch]
+            tags = {}
+            for recipe_pk, slug in Recipe.tags.through.objects.filter(
+                recipe__in=recipe_pks
+            ).values_list('recipe', 'tag__slug'):
+                tags.setdefault(recipe_pk, []).append(slug)
+            ingredients = {}
+            for recipe_pk, name, unit, amount in (
+                RecipeIngredient.objects.filter(
+                    recipe__in=recipe_pks
+                ).values_list(
+                    'recipe',
+                    'ingredient__name',
+                    'ingredient__measurement_unit',
+                    'amount',
+                )
+            ):
+                ingredients.setdefault(recipe_pk, []).append({
+                    'name': name,
+                    'measurement_unit': unit,
+                    'amount': amount,
+                })
+            for recipe in batch:
+                file.write(json.dumps(
+                    {
+                        'name': recipe['name'],
+                        'text': recipe['text'],
+                        'cooking_time': recipe['cooking_time'],
+                        'image': recipe['image'],
+                        'pub_date': recipe['pub_date'].isoformat(),
+                        'author': recipe['author__email'],
+                        'tags': tags.get(recipe['pk'], []),
+                        'ingredients': ingredients.get(recipe['pk'], []),
+                    },
+                    ensure_ascii=False
+                ) + '\n')
+            exported += len(batch)
+        return exported
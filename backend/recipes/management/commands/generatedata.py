@@ -0,0 +1,400 @@
+import io
+import itertools
+import random
+from datetime import timedelta
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from recipes import counters, feed
+from recipes.management.utils import (
+    batched,
+    bulk_create_dated,
+    bulk_create_with_pk,
+)
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag,
+)
+from users.models import Subscription
+
+User = get_user_model()
+
+PRESETS = {
+    'small': {
+        'users': 100,
+        'recipes': 500,
+        'subscriptions': 1_000,
+        'favorites': 2_000,
+        'carts': 500,
+    },
+    'medium': {
+        'users': 10_000,
+        'recipes': 50_000,
+        'subscriptions': 100_000,
+        'favorites': 200_000,
+        'carts': 50_000,
+    },
+    'large': {
+        'users': 100_000,
+        'recipes': 500_000,
+        'subscriptions': 1_000_000,
+        'favorites': 2_000_000,
+        'carts': 500_000,
+    },
+}
+DEFAULT_TAGS = (
+    ('Завтрак', '#E26C2D', 'breakfast'),
+    ('Обед', '#49B64E', 'lunch'),
+    ('Ужин', '#8775D2', 'dinner'),
+    ('Десерт', '#F9A62B', 'dessert'),
+    ('Выпечка', '#A0522D', 'baking'),
+    ('Напитки', '#2D9CDB', 'drinks'),
+)
+SYNTHETIC_INGREDIENTS = 1000
+MEASUREMENT_UNITS = ('г', 'кг', 'мл', 'л', 'шт.', 'ст. л.', 'ч. л.')
+WORDS = (
+    'мука', 'сахар', 'масло', 'яйцо', 'молоко', 'соль', 'перец', 'лук',
+    'чеснок', 'томат', 'сыр', 'курица', 'рис', 'гречка', 'картофель',
+    'морковь', 'тесто', 'соус', 'зелень', 'сметана', 'нарезать',
+    'обжарить', 'смешать', 'запечь', 'варить', 'добавить', 'посолить',
+    'подавать', 'горячим', 'минут', 'до', 'готовности', 'и', 'с', 'в',
+)
+IMAGE_NAME = 'recipes/images/synthetic.png'
+DAYS_SPAN = 365
+POWER_LAW_EXPONENT = 1.1
+# Power law draws of distinct targets before uniform sampling of the rest.
+SAMPLING_ATTEMPTS = 10
+FEED_REBUILD_BATCH_SIZE = 100
+PASSWORD = 'synthetic-password'
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетические данные: пользователей, подписки, '
+        'рецепты, избранное и списки покупок'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--preset',
+            choices=PRESETS,
+            default='small',
+            help='Размер набора данных.'
+        )
+        for name in PRESETS['small']:
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                help=f'Количество объектов {name}, заменяет значение '
+                     'из набора.'
+            )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора случайных чисел.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество объектов, создаваемых за один запрос.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        sizes = {
+            name: (
+                options[name] if options[name] is not None else value
+            )
+            for name, value in PRESETS[options['preset']].items()
+        }
+        if any(value < 0 for value in sizes.values()):
+            raise CommandError('Sizes must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        self.verbosity = options['verbosity']
+        self.batch_size = options['batch_size']
+        self.random = random.Random(options['seed'])
+        self.prefix = f'synthetic-{options["seed"]}'
+        if User.objects.filter(username__startswith=self.prefix).exists():
+            raise CommandError(
+                f'Data for seed {options["seed"]} is already generated'
+            )
+        self.now = timezone.now()
+        self.created = {}
+        tags = self.get_tags()
+        ingredients = self.get_ingredients()
+        self.create_image()
+        users = self.create_users(sizes['users'])
+        if len(users) < 2:
+            raise CommandError('At least 2 users are required')
+        recipes = self.create_recipes(
+            sizes['recipes'], users, tags, ingredients
+        )
+        self.create_relations(
+            'subscriptions', Subscription, 'subscription', users, users,
+            sizes['subscriptions'], exclude_self=True
+        )
+        self.create_relations(
+            'favorites', Favorite, 'recipe', users, recipes,
+            sizes['favorites'], dated=True
+        )
+        self.create_relations(
+            'carts', ShoppingCart, 'recipe', users, recipes, sizes['carts'],
+            dated=True
+        )
+        counters.reconcile(batch_size=self.batch_size)
+        self.rebuild_feeds()
+        self.stdout.write(self.style.SUCCESS(
+            'Successfully generated {users} users, {recipes} recipes, '
+            '{subscriptions} subscriptions, {favorites} favorites, '
+            '{carts} carts, {feeds} feeds'.format(**self.created)
+        ))
+
+    def rebuild_feeds(self):
+        """
+        Fill timelines of generated followers.
+
+        Subscriptions are bulk created without signals, so timelines are
+        filled after counters decide which authors are fanned out.
+        """
+        followers = Subscription.objects.filter(
+            user__username__startswith=self.prefix
+        ).order_by('user').values_list('user', flat=True).distinct()
+        rebuilt = 0
+        for batch in batched(
+            followers.iterator(), FEED_REBUILD_BATCH_SIZE
+        ):
+            with transaction.atomic():
+                feed.rebuild(batch)
+            rebuilt += len(batch)
+        self.report('feeds', rebuilt)
+
+    def report(self, name, count):
+        self.created[name] = count
+        if self.verbosity > 1:
+            self.stdout.write(f'Created {count} {name}')
+
+    def power_law(self, population):
+        """
+        Return function choosing `k` items from population.
+
+        Item popularity follows power law by item rank, ranks are
+        shuffled, so popularity doesn't depend on primary key.
+        """
+        population = list(population)
+        self.random.shuffle(population)
+        cum_weights = list(itertools.accumulate(
+            1 / rank ** POWER_LAW_EXPONENT
+            for rank in range(1, len(population) + 1)
+        ))
+
+        def choose(k=1):
+            return self.random.choices(
+                population, cum_weights=cum_weights, k=k
+            )
+        return choose
+
+    def activity(self, mean):
+        """Return skewed per user number of relations with given mean."""
+        if mean <= 0:
+            return 0
+        return int(self.random.expovariate(1 / mean) + 0.5)
+
+    def distribute(self, total, size, limit):
+        """
+        Return `size` skewed numbers from 0 to `limit` summing to `total`.
+
+        Numbers are drawn by `activity` and then randomly corrected by one
+        until their sum is exactly `total`.
+        """
+        counts = [min(self.activity(total / size), limit) for _ in range(size)]
+        difference = total - sum(counts)
+        step = 1 if difference > 0 else -1
+        while difference:
+            index = self.random.randrange(size)
+            if 0 <= counts[index] + step <= limit:
+                counts[index] += step
+                difference -= step
+        return counts
+
+    def choose_distinct(self, choose, targets, count, exclude=None):
+        """
+        Return set of `count` distinct targets chosen by power law.
+
+        Rare targets are hard to hit by power law, so targets still
+        missing after `SAMPLING_ATTEMPTS` draws are sampled uniformly.
+        """
+        chosen = set()
+        for _ in range(SAMPLING_ATTEMPTS):
+            if len(chosen) >= count:
+                return chosen
+            chosen.update(choose(count - len(chosen)))
+            chosen.discard(exclude)
+        rest = [
+            target for target in targets
+            if target not in chosen and target != exclude
+        ]
+        chosen.update(self.random.sample(rest, count - len(chosen)))
+        return chosen
+
+    def get_tags(self):
+        if not Tag.objects.exists():
+            Tag.objects.bulk_create(
+                Tag(name=name, color=color, slug=slug)
+                for name, color, slug in DEFAULT_TAGS
+            )
+        return list(Tag.objects.values_list('pk', flat=True))
+
+    def get_ingredients(self):
+        if not Ingredient.objects.exists():
+            Ingredient.objects.bulk_create(
+                (
+                    Ingredient(
+                        name=f'ингредиент {number}',
+                        measurement_unit=self.random.choice(
+                            MEASUREMENT_UNITS
+                        )
+                    )
+                    for number in range(SYNTHETIC_INGREDIENTS)
+                ),
+                batch_size=self.batch_size
+            )
+        return list(Ingredient.objects.values_list('pk', flat=True))
+
+    def create_image(self):
+        """Save placeholder image used by all generated recipes."""
+        if default_storage.exists(IMAGE_NAME):
+            return
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 64), '#E26C2D').save(buffer, 'PNG')
+        default_storage.save(IMAGE_NAME, ContentFile(buffer.getvalue()))
+
+    def text(self, min_words, max_words):
+        return ' '.join(self.random.choices(
+            WORDS, k=self.random.randint(min_words, max_words)
+        ))
+
+    def create_users(self, count):
+        password = make_password(PASSWORD)
+        users = (
+            User(
+                username=f'{self.prefix}-{number}',
+                email=f'{self.prefix}-{number}@example.com',
+                first_name=self.text(1, 1).capitalize(),
+                last_name=self.text(1, 1).capitalize(),
+                password=password,
+            )
+            for number in range(count)
+        )
+        created = []
+        for batch in batched(users, self.batch_size):
+            created.extend(
+                user.pk
+                for user in bulk_create_with_pk(User, batch)
+            )
+        self.report('users', len(created))
+        return created
+
+    def create_recipes(self, count, users, tags, ingredients):
+        choose_author = self.power_law(users)
+        choose_ingredients = self.power_law(ingredients)
+        created = []
+        for batch in batched(range(count), self.batch_size):
+            recipes = [
+                Recipe(
+                    name=self.text(2, 5).capitalize()[:200],
+                    text=self.text(20, 400).capitalize(),
+                    image=IMAGE_NAME,
+                    cooking_time=self.random.randint(5, 180),
+                    author_id=choose_author()[0],
+                    pub_date=self.now - timedelta(
+                        seconds=self.random.randint(0, DAYS_SPAN * 86400)
+                    ),
+                )
+                for _ in batch
+            ]
+            with transaction.atomic():
+                bulk_create_dated(Recipe, recipes, 'pub_date')
+                Recipe.tags.through.objects.bulk_create(
+                    Recipe.tags.through(recipe_id=recipe.pk, tag_id=tag)
+                    for recipe in recipes
+                    for tag in self.random.sample(
+                        tags, self.random.randint(1, min(3, len(tags)))
+                    )
+                )
+                RecipeIngredient.objects.bulk_create(
+                    RecipeIngredient(
+                        recipe_id=recipe.pk,
+                        ingredient_id=ingredient,
+                        amount=self.random.randint(1, 500)
+                    )
+                    for recipe in recipes
+                    for ingredient in set(choose_ingredients(
+                        self.random.randint(3, 12)
+                    ))
+                )
+            created.extend(recipe.pk for recipe in recipes)
+        self.report('recipes', len(created))
+        return created
+
+    def create_relations(self, name, model, field, users, targets, count,
+                         exclude_self=False, dated=False):
+        """
+        Create `count` user relations to targets chosen by power law.
+
+        Users activity is skewed too, relations are unique per user, so
+        count is limited by number of possible pairs.
+        Dated relations get random `created` date within `DAYS_SPAN`.
+        """
+        limit = len(targets) - 1 if exclude_self else len(targets)
+        if count > limit * len(users):
+            self.stderr.write(self.style.WARNING(
+                f'Only {limit * len(users)} of {count} {name} are possible'
+            ))
+            count = limit * len(users)
+        choose = self.power_law(targets)
+
+        def relations():
+            for user, user_count in zip(
+                users, self.distribute(count, len(users), limit)
+            ):
+                for target in self.choose_distinct(
+                    choose,
+                    targets,
+                    user_count,
+                    exclude=user if exclude_self else None
+                ):
+                    relation = model(
+                        **{'user_id': user, f'{field}_id': target}
+                    )
+                    if dated:
+                        relation.created = self.now - timedelta(
+                            seconds=self.random.randint(0, DAYS_SPAN * 86400)
+                        )
+                    yield relation
+
+        created = 0
+        for batch in batched(relations(), self.batch_size):
+            if dated:
+                bulk_create_dated(model, batch, 'created')
+            else:
+                model.objects.bulk_create(batch)
+            created += len(batch)
+        self.report(name, created)
@@ -1,9 +1,19 @@
 import csv
+import io
 from typing import Any
 
-from django.core.management.base import BaseCommand, CommandParser
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db import DatabaseError, connection, transaction
 
-from recipes.models import Ingredient
+from recipes.management.utils import batched
+from recipes.models import Ingredient, RecipeIngredient
+
+DEFAULT_BATCH_SIZE = 1000
+STAGING_TABLE = 'ingredient_import'
 
 
 class Command(BaseCommand):
@@ -11,17 +21,273 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser: CommandParser) -> None:
         parser.add_argument('file', nargs=1, type=str)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк, обрабатываемых за один запрос.'
+        )
+        parser.add_argument(
+            '--encoding',
+            default='utf-8-sig',
+            help='Кодировка файла.'
+        )
+        parser.add_argument(
+            '--delimiter',
+            default=',',
+            help='Разделитель столбцов.'
+        )
+        parser.add_argument(
+            '--skip-header',
+            action='store_true',
+            help='Пропустить первую строку файла.'
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help=(
+                'Обновить единицы измерения ингредиентов, которые уже '
+                'есть в базе с другой единицей измерения. Обновляются '
+                'только ингредиенты с одной единицей измерения в файле, '
+                'не используемые в рецептах.'
+            )
+        )
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='Загрузить файл через COPY (только PostgreSQL).'
+        )
 
     def handle(self, *args: Any, **options: Any) -> str | None:
-        with open(options['file'][0], 'r') as file:
-            reader = csv.reader(file)
-            created = Ingredient.objects.bulk_create(
-                (Ingredient(name=row[0], measurement_unit=row[1])
-                 for row in reader),
-                ignore_conflicts=True
-            )
+        self.verbosity = options['verbosity']
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        if len(options['delimiter']) != 1:
+            raise CommandError('--delimiter must be a single character')
+        try:
+            with open(
+                options['file'][0],
+                'r',
+                encoding=options['encoding'],
+                newline=''
+            ) as file:
+                if options['copy']:
+                    counts = self.import_copy(file, options)
+                else:
+                    counts = self.import_batches(file, options)
+        except (OSError, UnicodeDecodeError, DatabaseError) as error:
+            raise CommandError(error)
+        if counts['referenced']:
+            self.stdout.write(self.style.WARNING(
+                'Kept measurement units of {referenced} ingredients used '
+                'in recipes'.format(**counts)
+            ))
         self.stdout.write(
             self.style.SUCCESS(
-                f'Successfully imported {len(created)} rows'
+                'Successfully imported {total} rows: {inserted} inserted, '
+                '{updated} updated, {skipped} skipped'.format(**counts)
+            )
+        )
+
+    def report_progress(self, counts):
+        if self.verbosity > 1:
+            self.stdout.write(
+                'Processed {total} rows: {inserted} inserted, '
+                '{updated} updated, {skipped} skipped'.format(**counts)
+            )
+
+    def read_rows(self, file, options):
+        reader = csv.reader(file, delimiter=options['delimiter'])
+        if options['skip_header']:
+            next(reader, None)
+        return reader
+
+    def get_upsert_units(self, file, options):
+        """
+        Return units of ingredients with the only unit in the whole file.
+
+        File is read once more before import, so result doesn't depend on
+        batch size and matches COPY import.
+        """
+        units = {}
+        for row in self.read_rows(file, options):
+            if len(row) < 2:
+                continue
+            if units.setdefault(row[0], row[1]) != row[1]:
+                units[row[0]] = None
+        file.seek(0)
+        return {name: unit for name, unit in units.items() if unit is not None}
+
+    def import_batches(self, file, options):
+        """Import file by batches with ORM bulk queries."""
+        counts = dict.fromkeys(
+            ('total', 'inserted', 'updated', 'skipped', 'referenced'), 0
+        )
+        upsert_units = (
+            self.get_upsert_units(file, options) if options['upsert'] else {}
+        )
+        for rows in batched(
+            self.read_rows(file, options), options['batch_size']
+        ):
+            batch_counts = self.import_batch(rows, upsert_units)
+            for key, value in batch_counts.items():
+                counts[key] += value
+            self.report_progress(counts)
+        return counts
+
+    def import_batch(self, rows, upsert_units):
+        """
+        Import one batch of rows.
+
+        Rows already presented in the table are skipped. Ingredient with
+        the only measurement unit in the table gets the unit from
+        `upsert_units`, unless it is used in recipes. Then the new unit
+        is inserted as separate ingredient.
+        """
+        counts = {
+            'total': len(rows),
+            'inserted': 0,
+            'updated': 0,
+            'skipped': 0,
+            'referenced': 0,
+        }
+        batch_units = {}
+        for row in rows:
+            if len(row) < 2:
+                counts['skipped'] += 1
+                continue
+            units = batch_units.setdefault(row[0], {})
+            if row[1] in units:
+                counts['skipped'] += 1
+            units[row[1]] = None
+        existing = {}
+        for pk, name, unit in Ingredient.objects.filter(
+            name__in=batch_units
+        ).values_list('pk', 'name', 'measurement_unit'):
+            existing.setdefault(name, {})[unit] = pk
+        candidates = {
+            name: next(iter(existing_units.values()))
+            for name, existing_units in existing.items()
+            if name in upsert_units and len(existing_units) == 1
+            and upsert_units[name] not in existing_units
+        }
+        referenced = set(RecipeIngredient.objects.filter(
+            ingredient__in=candidates.values()
+        ).values_list('ingredient', flat=True).distinct())
+        counts['referenced'] = len(referenced)
+        new_ingredients = []
+        updated_ingredients = []
+        for name, units in batch_units.items():
+            existing_units = existing.get(name, {})
+            if name in candidates and candidates[name] not in referenced:
+                updated_ingredients.append(Ingredient(
+                    pk=candidates[name],
+                    name=name,
+                    measurement_unit=upsert_units[name]
+                ))
+                continue
+            for unit in units:
+                if unit in existing_units:
+                    counts['skipped'] += 1
+                else:
+                    new_ingredients.append(
+                        Ingredient(name=name, measurement_unit=unit)
+                    )
+        with transaction.atomic():
+            Ingredient.objects.bulk_update(
+                updated_ingredients,
+                ('measurement_unit',)
             )
+            Ingredient.objects.bulk_create(
+                new_ingredients,
+                ignore_conflicts=True
+            )
+        counts['updated'] = len(updated_ingredients)
+        counts['inserted'] = len(new_ingredients)
+        return counts
+
+    def import_copy(self, file, options):
+        """
+        Import file by PostgreSQL COPY into staging table.
+
+        Rows skipped by validation are counted as skipped, like in
+        `import_batches`.
+        """
+        if connection.vendor != 'postgresql':
+            raise CommandError('--copy is supported only by PostgreSQL')
+        table = connection.ops.quote_name(Ingredient._meta.db_table)
+        recipe_ingredients = connection.ops.quote_name(
+            RecipeIngredient._meta.db_table
+        )
+        counts = dict.fromkeys(
+            ('total', 'inserted', 'updated', 'skipped', 'referenced'), 0
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {STAGING_TABLE} '
+                '(name text, measurement_unit text) ON COMMIT DROP'
+            )
+            for rows in batched(
+                self.read_rows(file, options), options['batch_size']
+            ):
+                counts['total'] += len(rows)
+                self.copy_batch(cursor, rows)
+                self.report_progress(counts)
+            if options['upsert']:
+                cursor.execute(
+                    'CREATE TEMPORARY TABLE ingredient_upsert ON COMMIT DROP '
+                    'AS SELECT ingredient.id, staged.measurement_unit, '
+                    f'EXISTS (SELECT 1 FROM {recipe_ingredients} AS used '
+                    'WHERE used.ingredient_id = ingredient.id) AS referenced '
+                    f'FROM {table} AS ingredient '
+                    'JOIN (SELECT name, MIN(measurement_unit) '
+                    f'AS measurement_unit FROM {STAGING_TABLE} '
+                    'GROUP BY name '
+                    'HAVING COUNT(DISTINCT measurement_unit) = 1) AS staged '
+                    'ON ingredient.name = staged.name '
+                    'WHERE ingredient.measurement_unit '
+                    '<> staged.measurement_unit '
+                    f'AND NOT EXISTS (SELECT 1 FROM {table} AS other '
+                    'WHERE other.name = ingredient.name '
+                    'AND other.id <> ingredient.id)'
+                )
+                cursor.execute(
+                    'SELECT COUNT(*) FROM ingredient_upsert WHERE referenced'
+                )
+                counts['referenced'] = cursor.fetchone()[0]
+                cursor.execute(
+                    f'UPDATE {table} AS ingredient '
+                    'SET measurement_unit = upsert.measurement_unit '
+                    'FROM ingredient_upsert AS upsert '
+                    'WHERE ingredient.id = upsert.id AND NOT upsert.referenced'
+                )
+                counts['updated'] = cursor.rowcount
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                'SELECT DISTINCT name, measurement_unit '
+                f'FROM {STAGING_TABLE} '
+                'ON CONFLICT (name, measurement_unit) DO NOTHING'
+            )
+            counts['inserted'] = cursor.rowcount
+        counts['skipped'] = (
+            counts['total'] - counts['inserted'] - counts['updated']
+        )
+        return counts
+
+    def copy_batch(self, cursor, rows):
+        """
+        COPY valid rows of one batch into staging table.
+
+        Rows are validated like in `import_batch` and rewritten with the
+        default CSV dialect, so short rows are skipped instead of aborting
+        COPY and delimiter option never gets into SQL.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(
+            buffer, quoting=csv.QUOTE_ALL, lineterminator='\n'
+        )
+        writer.writerows(row[:2] for row in rows if len(row) >= 2)
+        buffer.seek(0)
+        cursor.copy_expert(
+            f'COPY {STAGING_TABLE} FROM STDIN WITH (FORMAT csv)', buffer
         )
@@ -0,0 +1,266 @@
+import json
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from foodgram_backend import constants
+from recipes import counters
+from recipes.management.utils import batched, bulk_create_dated
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+
+User = get_user_model()
+
+DEFAULT_BATCH_SIZE = 500
+REQUIRED_FIELDS = (
+    'name',
+    'text',
+    'cooking_time',
+    'image',
+    'author',
+    'tags',
+    'ingredients',
+)
+INGREDIENT_FIELDS = ('name', 'measurement_unit', 'amount')
+
+
+class Command(BaseCommand):
+    help = 'Импортирует рецепты из файла формата JSON Lines'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('file', nargs=1, type=str)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество рецептов, создаваемых за один запрос.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        self.verbosity = options['verbosity']
+        self.tags = dict(Tag.objects.values_list('slug', 'pk'))
+        self.authors = {}
+        self.touched = {'recipes.Recipe': [], 'users.CustomUser': set()}
+        imported = skipped = 0
+        try:
+            with open(options['file'][0], 'r', encoding='utf-8') as file:
+                lines = (
+                    (number, line)
+                    for number, line in enumerate(file, start=1)
+                    if line.strip()
+                )
+                for batch in batched(lines, options['batch_size']):
+                    batch_imported = self.import_batch(batch)
+                    imported += batch_imported
+                    skipped += len(batch) - batch_imported
+                    if self.verbosity > 1:
+                        self.stdout.write(
+                            f'Processed {imported + skipped} recipes'
+                        )
+        except (OSError, UnicodeDecodeError, DatabaseError) as error:
+            raise CommandError(error)
+        counters.reconcile(
+            batch_size=options['batch_size'], pks=self.touched
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Successfully imported {imported} recipes, '
+                f'{skipped} skipped'
+            )
+        )
+
+    def skip(self, number, reason):
+        self.stderr.write(f'Line {number} skipped: {reason}')
+
+    def load_authors(self, emails):
+        """Add missing authors to authors cache."""
+        emails = set(emails) - self.authors.keys()
+        self.authors.update(
+            User.objects.filter(email__in=emails).values_list('email', 'pk')
+        )
+
+    def load_ingredients(self, records):
+        """Return {(name, measurement_unit): pk} for batch ingredients."""
+        names = {
+            ingredient['name']
+            for record in records
+            for ingredient in record['ingredients']
+        }
+        return {
+            (name, unit): pk
+            for pk, name, unit in Ingredient.objects.filter(
+                name__in=names
+            ).values_list('pk', 'name', 'measurement_unit')
+        }
+
+    def positive_int(self, value, field):
+        """Return value as integer not less than 1."""
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(f'{field} must be an integer')
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValueError(f'{field} must be an integer')
+        if value < 1:
+            raise ValueError(f'{field} must be at least 1')
+        return value
+
+    def validate(self, record):
+        """
+        Check record fields and convert them to import values.
+
+        Tag slugs are replaced by pks, amounts and cooking time are
+        converted to integers, missing publication date is set to now.
+        Raise ValueError with description of the first invalid field.
+        """
+        missing = [field for field in REQUIRED_FIELDS if field not in record]
+        if missing:
+            raise ValueError(f"missing {', '.join(missing)}")
+        for field in ('name', 'text', 'image', 'author'):
+            if not isinstance(record[field], str) or not record[field]:
+                raise ValueError(f'{field} must be a non-empty string')
+        if len(record['name']) > constants.NAME_MAX_LENGTH:
+            raise ValueError(
+                f'name must be at most {constants.NAME_MAX_LENGTH} characters'
+            )
+        record['cooking_time'] = self.positive_int(
+            record['cooking_time'], 'cooking_time'
+        )
+        if not isinstance(record['tags'], list):
+            raise ValueError('tags must be a list')
+        tags = []
+        for slug in record['tags']:
+            if not isinstance(slug, str) or slug not in self.tags:
+                raise ValueError(f'unknown tag {slug!r}')
+            tags.append(self.tags[slug])
+        record['tags'] = tags
+        if not isinstance(record['ingredients'], list) or (
+            not record['ingredients']
+        ):
+            raise ValueError('ingredients must be a non-empty list')
+        keys = set()
+        for ingredient in record['ingredients']:
+            if not isinstance(ingredient, dict):
+                raise ValueError('ingredient must be a JSON object')
+            missing = [
+                field for field in INGREDIENT_FIELDS
+                if field not in ingredient
+            ]
+            if missing:
+                raise ValueError(f"ingredient missing {', '.join(missing)}")
+            key = (ingredient['name'], ingredient['measurement_unit'])
+            if not all(isinstance(value, str) for value in key):
+                raise ValueError(
+                    'ingredient name and measurement_unit must be strings'
+                )
+            if key in keys:
+                raise ValueError(f'duplicate ingredient {key[0]!r}')
+            keys.add(key)
+            ingredient['amount'] = self.positive_int(
+                ingredient['amount'], 'amount'
+            )
+        pub_date = record.get('pub_date')
+        if pub_date:
+            if not isinstance(pub_date, str):
+                raise ValueError('pub_date must be a string')
+            record['pub_date'] = parse_datetime(pub_date)
+            if record['pub_date'] is None:
+                raise ValueError(f'invalid pub_date {pub_date!r}')
+        else:
+            record['pub_date'] = timezone.now()
+
+    def parse(self, batch):
+        """Return list of (line number, record) with valid records."""
+        records = []
+        for number, line in batch:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as error:
+                self.skip(number, error)
+                continue
+            if not isinstance(record, dict):
+                self.skip(number, 'not a JSON object')
+                continue
+            try:
+                self.validate(record)
+            except ValueError as error:
+                self.skip(number, error)
+            else:
+                records.append((number, record))
+        return records
+
+    def import_batch(self, batch):
+        """
+        Create recipes with their tags and ingredients from batch lines.
+
+        Returns
+        -------
+        int
+            Number of created recipes.
+        """
+        records = self.parse(batch)
+        self.load_authors(record['author'] for _, record in records)
+        ingredients = self.load_ingredients(
+            record for _, record in records
+        )
+        recipes = []
+        recipes_tags = []
+        recipes_ingredients = []
+        for number, record in records:
+            if record['author'] not in self.authors:
+                self.skip(number, f"unknown author {record['author']}")
+                continue
+            try:
+                recipe_ingredients = {
+                    ingredients[
+                        ingredient['name'],
+                        ingredient['measurement_unit']
+                    ]: ingredient['amount']
+                    for ingredient in record['ingredients']
+                }
+            except KeyError as error:
+                self.skip(number, f'unknown ingredient {error}')
+                continue
+            recipes.append(Recipe(
+                name=record['name'],
+                text=record['text'],
+                cooking_time=record['cooking_time'],
+                image=record['image'],
+                author_id=self.authors[record['author']],
+                pub_date=record['pub_date']
+            ))
+            recipes_tags.append(record['tags'])
+            recipes_ingredients.append(recipe_ingredients)
+        with transaction.atomic():
+            bulk_create_dated(Recipe, recipes, 'pub_date')
+            Recipe.tags.through.objects.bulk_create(
+                Recipe.tags.through(recipe_id=recipe.pk, tag_id=tag)
+                for recipe, tags in zip(recipes, recipes_tags)
+                for tag in set(tags)
+            )
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(
+                    recipe_id=recipe.pk,
+                    ingredient_id=ingredient,
+                    amount=amount
+                )
+                for recipe, recipe_ingredients in zip(
+                    recipes,
+                    recipes_ingredients
+                )
+                for ingredient, amount in recipe_ingredients.items()
+            )
+        self.touched['recipes.Recipe'].extend(recipe.pk for recipe in recipes)
+        self.touched['users.CustomUser'].update(
+            recipe.author_id for recipe in recipes
+        )
+        return len(recipes)
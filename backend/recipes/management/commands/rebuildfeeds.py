@@ -0,0 +1,61 @@
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db import transaction
+
+from recipes import feed
+from recipes.management.utils import batched
+from users.models import Subscription
+
+User = get_user_model()
+
+DEFAULT_BATCH_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет ленты подписок пользователей заново, например после '
+        'загрузки рецептов или изменения FEED_MAX_ENTRIES'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            'users',
+            nargs='*',
+            type=int,
+            help='Id пользователей, по умолчанию все подписчики.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество лент, заполняемых в одной транзакции.'
+        )
+        parser.add_argument(
+            '--trim',
+            action='store_true',
+            help='Только удалить записи сверх FEED_MAX_ENTRIES, не '
+                 'заполняя ленты заново.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        users = options['users'] or Subscription.objects.order_by(
+            'user'
+        ).values_list('user', flat=True).distinct().iterator()
+        update = feed.trim if options['trim'] else feed.rebuild
+        processed = 0
+        for batch in batched(users, options['batch_size']):
+            with transaction.atomic():
+                update(batch)
+            processed += len(batch)
+        action = 'trimmed' if options['trim'] else 'rebuilt'
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully {action} {processed} feeds')
+        )
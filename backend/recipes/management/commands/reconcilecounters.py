@@ -0,0 +1,34 @@
+from typing import Any
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from recipes import counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счетчики избранного, списков покупок, рецептов и '
+        'подписчиков и исправляет расхождения'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=counters.DEFAULT_BATCH_SIZE,
+            help='Количество объектов, проверяемых за один запрос.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        fixed = counters.reconcile(batch_size=options['batch_size'])
+        for name, count in fixed.items():
+            self.stdout.write(f'{name}: fixed {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully reconciled counters, fixed {sum(fixed.values())}'
+        ))
@@ -0,0 +1,33 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from recipes import trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает список популярных рецептов по недавним добавлениям '
+        'в избранное и списки покупок'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=settings.TRENDING_SIZE,
+            help='Количество рецептов в списке.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options['size'] < 0:
+            raise CommandError('--size must not be negative')
+        count = trending.update(size=options['size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully ranked {count} recipes')
+        )
@@ -0,0 +1,67 @@
+import itertools
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+
+def batched(iterable, size):
+    """Split iterable into lists with at most `size` items."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_create_with_pk(model, objects, batch_size=None):
+    """
+    Bulk create objects and set their primary keys.
+
+    Databases without RETURNING support in bulk insert (SQLite, MySQL)
+    don't set primary keys on created objects, so for them keys are
+    assigned explicitly after the current maximum. Use it only when there
+    are no concurrent inserts into the table.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objects, batch_size=batch_size)
+    with transaction.atomic():
+        last_pk = model.objects.aggregate(last_pk=Max('pk'))['last_pk'] or 0
+        for pk, obj in enumerate(objects, start=last_pk + 1):
+            obj.pk = pk
+        return model.objects.bulk_create(objects, batch_size=batch_size)
+
+
+@contextmanager
+def explicit_dates(model, field_name):
+    """
+    Keep set values of `auto_now_add` field while saving `model`.
+
+    Field flag is process wide, so it's meant for management commands
+    only.
+    """
+    field = model._meta.get_field(field_name)
+    auto_now_add = field.auto_now_add
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = auto_now_add
+
+
+def bulk_create_dated(model, objects, field_name, batch_size=None):
+    """
+    Bulk create objects keeping set values of `auto_now_add` field.
+
+    Dates are inserted in the same statements as other fields, objects
+    without date get current time. Objects get primary keys like in
+    `bulk_create_with_pk`.
+    """
+    now = timezone.now()
+    for obj in objects:
+        if getattr(obj, field_name) is None:
+            setattr(obj, field_name, now)
+    with explicit_dates(model, field_name):
+        return bulk_create_with_pk(model, objects, batch_size=batch_size)
@@ -0,0 +1,38 @@
+# Generated by Django 3.2 on 2026-10-19 11:10
+
+from django.db import migrations, models
+
+from recipes.operations import AddIndexConcurrently, RunPostgreSQL
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('recipes', '0010_recipeingredient_ingredient_recipe_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='favorite',
+            index=models.Index(fields=['recipe', 'user'], name='favorite_recipe_user_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['-pub_date'], name='recipe_pub_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['author', '-pub_date'], name='recipe_author_pub_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='shoppingcart',
+            index=models.Index(fields=['recipe', 'user'], name='shoppingcart_recipe_user_idx'),
+        ),
+        RunPostgreSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ingredient_name_upper_idx '
+            'ON recipes_ingredient (UPPER(name::text) text_pattern_ops)',
+            'DROP INDEX CONCURRENTLY IF EXISTS ingredient_name_upper_idx',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0016_recipesimilarity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipesimilarity',
+            name='kind',
+            field=models.CharField(choices=[('favorites', 'Избранное'), ('ingredients', 'Ингредиенты и теги')], max_length=16, verbose_name='Тип'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+
+from recipes.operations import RunPostgreSQL
+
+BATCH_SIZE = 1000
+# Existing rows are filled by batches in autocommit, so table rows are
+# not locked all at once, and index is built without blocking writes.
+POSTGRESQL_BACKFILL = """
+    UPDATE recipes_recipe SET search_vector =
+        setweight(to_tsvector(
+            'pg_catalog.russian', coalesce(recipes_recipe.name, '')
+        ), 'A')
+        || setweight(to_tsvector(
+            'pg_catalog.russian', coalesce(recipes_recipe.text, '')
+        ), 'B')
+    WHERE id > %s AND id <= %s
+"""
+POSTGRESQL_INDEX = (
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS '
+    'recipes_recipe_search_vector_idx ON recipes_recipe '
+    'USING gin (search_vector)'
+)
+POSTGRESQL_DROP_INDEX = (
+    'DROP INDEX CONCURRENTLY IF EXISTS recipes_recipe_search_vector_idx'
+)
+
+
+def backfill(apps, schema_editor):
+    """Fill PostgreSQL search vectors of existing recipes by id ranges."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT MAX(id) FROM recipes_recipe')
+        last_id = cursor.fetchone()[0] or 0
+        for start in range(0, last_id, BATCH_SIZE):
+            cursor.execute(POSTGRESQL_BACKFILL, (start, start + BATCH_SIZE))
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('recipes', '0017_recipesimilarity_ingredients'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        RunPostgreSQL(POSTGRESQL_INDEX, POSTGRESQL_DROP_INDEX),
+    ]
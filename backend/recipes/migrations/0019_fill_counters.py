@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from recipes import counters
+
+
+def fill_counters(apps, schema_editor):
+    counters.reconcile(apps)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('recipes', '0018_recipe_search_backfill'),
+        ('users', '0008_customuser_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -3,6 +3,7 @@ from django.core.validators import MinValueValidator, RegexValidator
 from django.db import models
 
 from foodgram_backend import constants
+from recipes.counters import CountersMixin
 
 User = get_user_model()
 
@@ -79,7 +80,7 @@ class Ingredient(models.Model):
         return f'{self.name}, {self.measurement_unit}'
 
 
-class Recipe(models.Model):
+class Recipe(CountersMixin, models.Model):
     """
     Recipe model.
 
@@ -91,7 +92,11 @@ class Recipe(models.Model):
     * image (Image);
     * cooking_time (Int);
     * author (Int) - FK to User model, cascade on delete;
-    * pub_date (DateTime) - Recipe creation date, auto now.
+    * pub_date (DateTime) - Recipe creation date, auto now;
+    * favorites_count (Int) - number of users with recipe in favorites;
+    * in_carts_count (Int) - number of users with recipe in shopping cart.
+
+    Counters are not written by `save()` of existing recipe.
     """
 
     name = models.CharField(
@@ -135,6 +140,18 @@ class Recipe(models.Model):
         'Дата публикации',
         auto_now_add=True
     )
+    favorites_count = models.PositiveIntegerField(
+        'В избранном',
+        default=0,
+        editable=False
+    )
+    in_carts_count = models.PositiveIntegerField(
+        'В списках покупок',
+        default=0,
+        editable=False
+    )
+
+    counter_fields = ('favorites_count', 'in_carts_count')
 
     class Meta:
         verbose_name = 'Рецепт'
@@ -142,6 +159,24 @@ class Recipe(models.Model):
         ordering = (
             '-pub_date',
         )
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='recipe_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=['-favorites_count', '-id'],
+                name='recipe_popularity_idx'
+            ),
+            models.Index(
+                fields=['cooking_time', 'id'],
+                name='recipe_cooking_time_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='recipe_author_pub_date_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -184,6 +219,12 @@ class RecipeIngredient(models.Model):
                 name='unique_recipe_ingredient'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['ingredient', 'recipe'],
+                name='ingredient_recipe_idx'
+            )
+        ]
         verbose_name = 'Рецепт и ингредиент'
         verbose_name_plural = 'Рецепты и ингредиенты'
 
@@ -197,7 +238,9 @@ class ShoppingCart(models.Model):
 
     Fields:
     * user (Int) - FK to User, cascade on delete;
-    * recipe (Int) - FK to Recipe, cascade on delete.
+    * recipe (Int) - FK to Recipe, cascade on delete;
+    * created (DateTime) - date of adding, auto now, empty for adds made
+    before dates were stored.
 
     User and recipe pair must be unique.
     """
@@ -214,6 +257,11 @@ class ShoppingCart(models.Model):
         related_name='shoppingusers',
         verbose_name='Рецепты'
     )
+    created = models.DateTimeField(
+        'Дата добавления',
+        auto_now_add=True,
+        null=True
+    )
 
     class Meta:
         verbose_name = 'Список покупок'
@@ -227,6 +275,16 @@ class ShoppingCart(models.Model):
                 name='unique_user_recipe'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['created'],
+                name='shoppingcart_created_idx'
+            ),
+            models.Index(
+                fields=['recipe', 'user'],
+                name='shoppingcart_recipe_user_idx'
+            )
+        ]
 
     def __str__(self) -> str:
         return f'{self.user.username}: {self.recipe.name}'
@@ -238,7 +296,9 @@ class Favorite(models.Model):
 
     Fields:
     * user (Int) - FK to User, cascade on delete;
-    * recipe (Int) - FK to Recipe, cascade on delete.
+    * recipe (Int) - FK to Recipe, cascade on delete;
+    * created (DateTime) - date of adding, auto now, empty for adds made
+    before dates were stored.
 
     User and recipe pair must be unique.
     """
@@ -255,6 +315,11 @@ class Favorite(models.Model):
         related_name='favorings',
         verbose_name='Рецепты'
     )
+    created = models.DateTimeField(
+        'Дата добавления',
+        auto_now_add=True,
+        null=True
+    )
 
     class Meta:
         verbose_name = 'Избранное'
@@ -268,6 +333,182 @@ class Favorite(models.Model):
                 name='unique_favorite_user_recipe'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['created'],
+                name='favorite_created_idx'
+            ),
+            models.Index(
+                fields=['recipe', 'user'],
+                name='favorite_recipe_user_idx'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.user.username}: {self.recipe.name}'
+
+
+class TimelineEntry(models.Model):
+    """
+    Subscription feed entry model.
+
+    Fields:
+    * user (Int) - FK to feed owner, cascade on delete;
+    * recipe (Int) - FK to Recipe, cascade on delete;
+    * author (Int) - FK to recipe author, cascade on delete;
+    * pub_date (DateTime) - recipe publication date.
+
+    User and recipe pair must be unique.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Пользователь'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Рецепт'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    pub_date = models.DateTimeField(
+        'Дата публикации'
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Ленты подписок'
+        ordering = (
+            'user',
+            '-pub_date',
+        )
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='unique_timeline_user_recipe'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date'],
+                name='timeline_user_pub_date_idx'
+            ),
+            models.Index(
+                fields=['user', 'author'],
+                name='timeline_user_author_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return f'{self.user.username}: {self.recipe.name}'
+
+
+class TrendingRecipe(models.Model):
+    """
+    Trending recipes snapshot model.
+
+    Fields:
+    * recipe (Int) - OneToOne to Recipe, cascade on delete;
+    * rank (Int) - position in trending list, from 1;
+    * score (Float) - time decayed popularity score.
+
+    Snapshot is replaced by `updatetrending` command.
+    """
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='trending',
+        verbose_name='Рецепт'
+    )
+    rank = models.PositiveIntegerField(
+        'Место',
+        unique=True
+    )
+    score = models.FloatField(
+        'Рейтинг'
+    )
+
+    class Meta:
+        verbose_name = 'Популярный рецепт'
+        verbose_name_plural = 'Популярные рецепты'
+        ordering = (
+            'rank',
+        )
+
+    def __str__(self) -> str:
+        return f'{self.rank}. {self.recipe.name}'
+
+
+class RecipeSimilarity(models.Model):
+    """
+    Precomputed similar recipes model.
+
+    Fields:
+    * recipe (Int) - FK to Recipe, cascade on delete;
+    * similar (Int) - FK to similar Recipe, cascade on delete;
+    * kind (Char) - similarity source;
+    * score (Float) - similarity, higher is more similar.
+
+    Recipe, similar recipe and kind must be unique.
+    """
+
+    FAVORITES = 'favorites'
+    INGREDIENTS = 'ingredients'
+    KINDS = (
+        (FAVORITES, 'Избранное'),
+        (INGREDIENTS, 'Ингредиенты и теги'),
+    )
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='similarities',
+        verbose_name='Рецепт'
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='similar_to',
+        verbose_name='Похожий рецепт'
+    )
+    kind = models.CharField(
+        'Тип',
+        max_length=16,
+        choices=KINDS
+    )
+    score = models.FloatField(
+        'Сходство'
+    )
+
+    class Meta:
+        verbose_name = 'Похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+        ordering = (
+            'recipe',
+            'kind',
+            '-score',
+        )
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'kind', 'similar'],
+                name='unique_recipe_kind_similar'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['recipe', 'kind', '-score'],
+                name='similarity_recipe_score_idx'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.recipe.name} ~ {self.similar.name}'
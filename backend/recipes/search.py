@@ -0,0 +1,143 @@
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVectorField,
+)
+from django.db import connection
+from django.db.models import (
+    BooleanField,
+    Expression,
+    FloatField,
+    IntegerField,
+    Q,
+    Value,
+)
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'russian'
+FTS_TABLE = 'recipes_recipe_fts'
+TERM_REGEX = re.compile(r'\w+')
+RANK = 'search_rank'
+
+# SQLite: FTS5 table is synchronized by triggers, see migration 0009.
+# Django recreates tables on SQLite schema changes, which drops triggers,
+# so they are installed again after every migrate.
+SQLITE_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON recipes_recipe BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, text)
+        VALUES (new.id, new.name, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON recipes_recipe BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, text)
+        VALUES ('delete', old.id, old.name, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF name, text ON recipes_recipe BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, text)
+        VALUES ('delete', old.id, old.name, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, name, text)
+        VALUES (new.id, new.name, new.text);
+    END
+    """,
+)
+
+
+class RecipeColumn(Expression):
+    """
+    Column of recipes table which is not a model field.
+
+    Column is qualified by recipes table alias of the compiled query, so
+    expression works in subqueries too.
+    """
+
+    def __init__(self, column, output_field):
+        super().__init__(output_field=output_field)
+        self.column = column
+
+    def as_sql(self, compiler, connection):
+        table = compiler.quote_name_unless_alias(
+            compiler.query.get_initial_alias()
+        )
+        return f'{table}.{connection.ops.quote_name(self.column)}', []
+
+
+class SQLiteMatch(Expression):
+    """
+    Condition joining recipes with FTS5 table rows matching query.
+
+    FTS5 table must be added to query tables, recipes table alias is
+    taken from compiled query.
+    """
+
+    output_field = BooleanField()
+
+    def __init__(self, query):
+        super().__init__()
+        self.query = query
+
+    def as_sql(self, compiler, connection):
+        recipe_id, params = RecipeColumn('id', IntegerField()).as_sql(
+            compiler, connection
+        )
+        return (
+            f'({FTS_TABLE}.rowid = {recipe_id} AND {FTS_TABLE} MATCH %s)',
+            [*params, self.query]
+        )
+
+
+def install_sqlite_triggers(using_connection):
+    """Restore SQLite triggers dropped by table recreation."""
+    if (using_connection.vendor != 'sqlite'
+            or FTS_TABLE not in using_connection.introspection.table_names()):
+        return
+    with using_connection.cursor() as cursor:
+        for statement in SQLITE_TRIGGERS:
+            cursor.execute(statement)
+
+
+def search(queryset, value):
+    """
+    Filter recipes by full-text search query, order by relevance.
+
+    PostgreSQL uses web search syntax with russian stemming, SQLite
+    matches all words by prefix. Relevance is annotated as `RANK`, higher
+    is better, recipes equal by it are ordered by date and primary key.
+    """
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(
+            value, config=SEARCH_CONFIG, search_type='websearch'
+        )
+        vector = RecipeColumn('search_vector', SearchVectorField())
+        queryset = queryset.alias(
+            search_vector=vector
+        ).filter(
+            search_vector=query
+        ).annotate(
+            **{RANK: SearchRank(vector, query)}
+        )
+    elif connection.vendor == 'sqlite':
+        terms = TERM_REGEX.findall(value.lower())
+        if not terms:
+            return queryset.none()
+        query = ' '.join(f'"{term}"*' for term in terms)
+        queryset = queryset.extra(
+            tables=(FTS_TABLE,)
+        ).filter(
+            SQLiteMatch(query)
+        ).annotate(**{RANK: RawSQL(
+            f'-bm25({FTS_TABLE}, 10.0, 1.0)', (), output_field=FloatField()
+        )})
+    else:
+        queryset = queryset.filter(
+            Q(name__icontains=value) | Q(text__icontains=value)
+        ).annotate(**{RANK: Value(0.0, output_field=FloatField())})
+    return queryset.order_by(f'-{RANK}', '-pub_date', '-pk')
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from recipes import counters, feed, search
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription
+
+User = get_user_model()
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    """Restore SQLite full-text search triggers after migrations."""
+    if sender.name == 'recipes':
+        search.install_sqlite_triggers(connections[using])
+
+
+@receiver(post_save, sender=Recipe)
+def fanout_recipe(sender, instance, created, **kwargs):
+    """Add published recipe to followers timelines after commit."""
+    if created:
+        feed.after_commit(feed.fanout, instance)
+
+
+@receiver(post_save, sender=Subscription)
+def follow_author(sender, instance, created, **kwargs):
+    if created:
+        feed.after_commit(
+            feed.follow, instance.user_id, instance.subscription_id
+        )
+
+
+@receiver(post_delete, sender=Subscription)
+def unfollow_author(sender, instance, **kwargs):
+    feed.unfollow(instance.user_id, instance.subscription_id)
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(User, instance.author_id, 'recipes_count')
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(sender, instance, **kwargs):
+    counters.decrement(User, instance.author_id, 'recipes_count')
+
+
+@receiver(post_save, sender=Subscription)
+def increment_subscribers_count(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(
+            User, instance.subscription_id, 'subscribers_count'
+        )
+
+
+@receiver(post_delete, sender=Subscription)
+def decrement_subscribers_count(sender, instance, **kwargs):
+    counters.decrement(User, instance.subscription_id, 'subscribers_count')
+
+
+@receiver(post_save, sender=Favorite)
+def increment_favorites_count(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(Recipe, instance.recipe_id, 'favorites_count')
+
+
+@receiver(post_delete, sender=Favorite)
+def decrement_favorites_count(sender, instance, **kwargs):
+    counters.decrement(Recipe, instance.recipe_id, 'favorites_count')
+
+
+@receiver(post_save, sender=ShoppingCart)
+def increment_in_carts_count(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(Recipe, instance.recipe_id, 'in_carts_count')
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def decrement_in_carts_count(sender, instance, **kwargs):
+    counters.decrement(Recipe, instance.recipe_id, 'in_carts_count')
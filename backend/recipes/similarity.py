@@ -0,0 +1,364 @@
+import heapq
+import itertools
+import logging
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+
+from recipes.management.utils import batched
+from recipes.models import Favorite, Recipe, RecipeIngredient, RecipeSimilarity
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+CONTENT_CHUNK_SIZE = 200
+
+
+def available():
+    """Check if NumPy and SciPy required for matrix building are installed."""
+    return sparse is not None
+
+
+def pairs_array(queryset):
+    """Return (n, 2) array of integer pairs from `values_list` queryset."""
+    return np.fromiter(
+        (
+            value
+            for pair in queryset.order_by().iterator(chunk_size=CHUNK_SIZE)
+            for value in pair
+        ),
+        dtype=np.int64
+    ).reshape(-1, 2)
+
+
+def binary_matrix(pairs):
+    """
+    Return binary recipe by feature matrix and recipe pks by row.
+
+    Parameters
+    ----------
+    pairs : ndarray
+        (recipe pk, feature) pairs.
+
+    Returns
+    -------
+    tuple
+        CSR matrix (recipes, features) and array of recipe pks.
+    """
+    recipe_pks, rows = np.unique(pairs[:, 0], return_inverse=True)
+    _, columns = np.unique(pairs[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.float32), (rows, columns)),
+        shape=(len(recipe_pks), columns.max() + 1 if len(pairs) else 0)
+    )
+    return matrix, recipe_pks
+
+
+def favorites_matrix():
+    """Return recipe by user favorites matrix and recipe pks by row."""
+    return binary_matrix(pairs_array(
+        Favorite.objects.values_list('recipe', 'user')
+    ))
+
+
+def content_matrix():
+    """
+    Return recipe by ingredient and tag matrix and recipe pks by row.
+
+    Tags are stored as negative features, so they don't clash with
+    ingredients.
+    """
+    tags = pairs_array(Recipe.tags.through.objects.values_list(
+        'recipe', 'tag'
+    ))
+    tags[:, 1] = -tags[:, 1]
+    return binary_matrix(np.concatenate((
+        pairs_array(RecipeIngredient.objects.values_list(
+            'recipe', 'ingredient'
+        )),
+        tags,
+    )))
+
+
+def top_neighbors(matrix, recipe_pks, top_k, chunk_size, jaccard=False):
+    """
+    Yield (recipe pk, similar recipe pk, score) of top neighbors.
+
+    Score is cosine or Jaccard similarity of binary rows. Similarities
+    are computed as sparse product of rows chunk and whole matrix, so
+    memory is bounded by chunk co-occurrences.
+    """
+    sizes = np.asarray(matrix.sum(axis=1)).ravel()
+    if jaccard:
+        left = matrix
+    else:
+        norms = np.sqrt(sizes)
+        norms[norms == 0] = 1
+        left = sparse.diags(1 / norms) @ matrix
+    right = left.T.tocsr()
+    for start in range(0, matrix.shape[0], chunk_size):
+        chunk = (left[start:start + chunk_size] @ right).tocsr()
+        if jaccard:
+            rows = np.repeat(
+                np.arange(chunk.shape[0]) + start, np.diff(chunk.indptr)
+            )
+            chunk.data /= sizes[rows] + sizes[chunk.indices] - chunk.data
+        chunk.setdiag(0, k=start)
+        chunk.eliminate_zeros()
+        for row in range(chunk.shape[0]):
+            begin, end = chunk.indptr[row], chunk.indptr[row + 1]
+            scores = chunk.data[begin:end]
+            columns = chunk.indices[begin:end]
+            if len(scores) > top_k:
+                best = np.argpartition(-scores, top_k)[:top_k]
+                scores, columns = scores[best], columns[best]
+            recipe_pk = int(recipe_pks[start + row])
+            for column, score in zip(columns, scores):
+                yield recipe_pk, int(recipe_pks[column]), float(score)
+
+
+def replace(kind, neighbors):
+    """Replace similar recipes of kind, return number of saved pairs."""
+    saved = 0
+    with transaction.atomic():
+        RecipeSimilarity.objects.filter(kind=kind).delete()
+        for batch in batched(neighbors, CHUNK_SIZE):
+            RecipeSimilarity.objects.bulk_create(
+                RecipeSimilarity(
+                    recipe_id=recipe_pk,
+                    similar_id=similar_pk,
+                    kind=kind,
+                    score=score
+                )
+                for recipe_pk, similar_pk, score in batch
+            )
+            saved += len(batch)
+    return saved
+
+
+def build_favorites(top_k=None, chunk_size=None):
+    """
+    Replace favorites based similar recipes.
+
+    Recipes are similar if they are favorited by the same users, score
+    is cosine similarity of recipe favorites vectors. Return number of
+    saved pairs.
+    """
+    matrix, recipe_pks = favorites_matrix()
+    return replace(RecipeSimilarity.FAVORITES, top_neighbors(
+        matrix,
+        recipe_pks,
+        top_k or settings.SIMILAR_RECIPES_COUNT,
+        chunk_size or CHUNK_SIZE
+    ))
+
+
+def postings(ingredient, recipe_id, limit):
+    """Return up to `limit` newest other recipes with ingredient."""
+    return list(RecipeIngredient.objects.filter(
+        ingredient=ingredient
+    ).exclude(
+        recipe=recipe_id
+    ).order_by(
+        '-recipe_id'
+    ).values_list('recipe', flat=True)[:limit])
+
+
+def candidates(ingredients, recipe_id):
+    """
+    Return recipes sharing the most ingredients with recipe.
+
+    (ingredient, recipe) index is read as inverted index, at most
+    `SIMILARITY_MAX_POSTINGS` newest recipes per ingredient. Ingredients
+    of more recipes are too common to tell similar recipes apart and are
+    skipped, unless all ingredients are common. Up to
+    `SIMILARITY_CANDIDATES` recipes are returned, so update cost doesn't
+    grow with number of recipes.
+    """
+    limit = settings.SIMILARITY_MAX_POSTINGS
+    lists = [
+        postings(ingredient, recipe_id, limit + 1)
+        for ingredient in ingredients
+    ]
+    rare = [recipes for recipes in lists if len(recipes) <= limit]
+    counts = Counter(itertools.chain.from_iterable(
+        rare or (recipes[:limit] for recipes in lists)
+    ))
+    return [
+        candidate for candidate, _ in heapq.nlargest(
+            settings.SIMILARITY_CANDIDATES,
+            counts.items(),
+            key=lambda item: (item[1], item[0])
+        )
+    ]
+
+
+def content_neighbors(recipe_id):
+    """
+    Return (similar recipe pk, score) pairs by ingredients and tags.
+
+    Candidates are found by `candidates`, score is Jaccard similarity of
+    ingredients and tags sets. Pairs are sorted by score, highest first.
+    """
+    ingredients = list(RecipeIngredient.objects.filter(
+        recipe=recipe_id
+    ).values_list('ingredient', flat=True))
+    if not ingredients:
+        return []
+    tags = list(Recipe.tags.through.objects.filter(
+        recipe=recipe_id
+    ).values_list('tag', flat=True))
+    common = {}
+    sizes = {}
+    for candidate, size, count in RecipeIngredient.objects.filter(
+        recipe__in=candidates(ingredients, recipe_id)
+    ).values('recipe').annotate(
+        size=Count('pk'),
+        common=Count('pk', filter=Q(ingredient__in=ingredients))
+    ).order_by().values_list('recipe', 'size', 'common'):
+        sizes[candidate] = size
+        common[candidate] = count
+    for candidate, size, count in Recipe.tags.through.objects.filter(
+        recipe__in=list(common)
+    ).values('recipe').annotate(
+        size=Count('pk'),
+        common=Count('pk', filter=Q(tag__in=tags))
+    ).order_by().values_list('recipe', 'size', 'common'):
+        sizes[candidate] += size
+        common[candidate] += count
+    size = len(ingredients) + len(tags)
+    return sorted(
+        (
+            (candidate, count / (size + sizes[candidate] - count))
+            for candidate, count in common.items()
+        ),
+        key=lambda pair: (-pair[1], pair[0])
+    )
+
+
+def features(recipe_id):
+    """Return ingredient and tag pk sets compared by content similarity."""
+    return (
+        set(RecipeIngredient.objects.filter(
+            recipe=recipe_id
+        ).values_list('ingredient', flat=True)),
+        set(Recipe.tags.through.objects.filter(
+            recipe=recipe_id
+        ).values_list('tag', flat=True)),
+    )
+
+
+def update_recipe(recipe_id, top_k=None):
+    """
+    Update ingredients based similar recipes after recipe change.
+
+    Recipe gets new top neighbors, and recipe is inserted into
+    neighbors lists of candidates where it is better than the worst
+    one, so only one recipe is recomputed. Lists of recipes no longer
+    similar to changed one lose it until the next full build. Pairs
+    saved meanwhile by concurrent update are kept.
+    """
+    top_k = top_k or settings.SIMILAR_RECIPES_COUNT
+    kind = RecipeSimilarity.INGREDIENTS
+    neighbors = content_neighbors(recipe_id)
+    with transaction.atomic():
+        RecipeSimilarity.objects.filter(
+            Q(recipe=recipe_id) | Q(similar=recipe_id),
+            kind=kind
+        ).delete()
+        stats = {
+            candidate: (count, lowest)
+            for candidate, count, lowest in RecipeSimilarity.objects.filter(
+                recipe__in=[candidate for candidate, _ in neighbors],
+                kind=kind
+            ).values('recipe').annotate(
+                count=Count('pk'),
+                lowest=Min('score')
+            ).order_by().values_list('recipe', 'count', 'lowest')
+        }
+        rows = [
+            RecipeSimilarity(
+                recipe_id=recipe_id,
+                similar_id=candidate,
+                kind=kind,
+                score=score
+            )
+            for candidate, score in neighbors[:top_k]
+        ]
+        overflowing = []
+        for candidate, score in neighbors:
+            count, lowest = stats.get(candidate, (0, 0))
+            if count < top_k or score > lowest:
+                rows.append(RecipeSimilarity(
+                    recipe_id=candidate,
+                    similar_id=recipe_id,
+                    kind=kind,
+                    score=score
+                ))
+                if count >= top_k:
+                    overflowing.append(candidate)
+        RecipeSimilarity.objects.bulk_create(
+            rows,
+            batch_size=CHUNK_SIZE,
+            ignore_conflicts=True
+        )
+        kept = {}
+        extra = []
+        for pk, candidate in RecipeSimilarity.objects.filter(
+            recipe__in=overflowing,
+            kind=kind
+        ).order_by(
+            'recipe_id', '-score', 'similar_id'
+        ).values_list('pk', 'recipe'):
+            kept[candidate] = kept.get(candidate, 0) + 1
+            if kept[candidate] > top_k:
+                extra.append(pk)
+        RecipeSimilarity.objects.filter(pk__in=extra).delete()
+
+
+def update_after_commit(recipe_id):
+    """
+    Update similar recipes after recipe ingredients and tags are saved.
+
+    Nothing is done without `SIMILARITY_UPDATE_ON_SAVE` setting, lists
+    are updated by `buildsimilarrecipes` command then. Errors are logged
+    instead of raised, so committed request doesn't fail.
+    """
+    if not settings.SIMILARITY_UPDATE_ON_SAVE:
+        return
+
+    def call():
+        try:
+            update_recipe(recipe_id)
+        except Exception:
+            logger.exception(
+                'Similar recipes update of recipe %s failed', recipe_id
+            )
+    transaction.on_commit(call)
+
+
+def build_ingredients(top_k=None, chunk_size=None):
+    """
+    Replace ingredients based similar recipes of all recipes.
+
+    Score is Jaccard similarity of ingredients and tags sets, like in
+    `update_recipe`, but all recipes are compared. Chunks are smaller
+    than for favorites, since common ingredients make products dense.
+    Return number of saved pairs.
+    """
+    matrix, recipe_pks = content_matrix()
+    return replace(RecipeSimilarity.INGREDIENTS, top_neighbors(
+        matrix,
+        recipe_pks,
+        top_k or settings.SIMILAR_RECIPES_COUNT,
+        chunk_size or CONTENT_CHUNK_SIZE,
+        jaccard=True
+    ))
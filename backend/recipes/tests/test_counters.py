@@ -0,0 +1,133 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from recipes import counters
+from recipes.models import Favorite, Recipe, ShoppingCart
+from recipes.tests.utils import create_recipe, create_user
+from users.models import Subscription
+
+User = get_user_model()
+
+
+class CounterSignalsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.reader = create_user('reader')
+        cls.recipe = create_recipe(cls.author)
+
+    def counter(self, model, pk, field):
+        return model.objects.values_list(field, flat=True).get(pk=pk)
+
+    def test_recipes_count(self):
+        self.assertEqual(
+            self.counter(User, self.author.pk, 'recipes_count'), 1
+        )
+        create_recipe(self.author).delete()
+        self.assertEqual(
+            self.counter(User, self.author.pk, 'recipes_count'), 1
+        )
+
+    def test_subscribers_count(self):
+        subscription = Subscription.objects.create(
+            user=self.reader, subscription=self.author
+        )
+        self.assertEqual(
+            self.counter(User, self.author.pk, 'subscribers_count'), 1
+        )
+        subscription.delete()
+        self.assertEqual(
+            self.counter(User, self.author.pk, 'subscribers_count'), 0
+        )
+
+    def test_recipe_relations_counts(self):
+        for model, field in (
+            (Favorite, 'favorites_count'),
+            (ShoppingCart, 'in_carts_count'),
+        ):
+            with self.subTest(model=model.__name__):
+                relation = model.objects.create(
+                    user=self.reader, recipe=self.recipe
+                )
+                self.assertEqual(
+                    self.counter(Recipe, self.recipe.pk, field), 1
+                )
+                relation.delete()
+                self.assertEqual(
+                    self.counter(Recipe, self.recipe.pk, field), 0
+                )
+
+    def test_decrement_not_below_zero(self):
+        counters.decrement(Recipe, self.recipe.pk, 'favorites_count')
+        self.assertEqual(
+            self.counter(Recipe, self.recipe.pk, 'favorites_count'), 0
+        )
+
+    def test_save_keeps_counters(self):
+        recipe = Recipe.objects.get(pk=self.recipe.pk)
+        Favorite.objects.create(user=self.reader, recipe=self.recipe)
+        recipe.name = 'Новое название'
+        recipe.save()
+        self.assertEqual(
+            self.counter(Recipe, self.recipe.pk, 'favorites_count'), 1
+        )
+
+
+class ReconcileTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.reader = create_user('reader')
+        cls.recipes = [create_recipe(cls.author) for _ in range(3)]
+        Favorite.objects.create(user=cls.reader, recipe=cls.recipes[0])
+        Subscription.objects.create(user=cls.reader, subscription=cls.author)
+
+    def test_reconcile_fixes_drift(self):
+        Recipe.objects.update(favorites_count=5, in_carts_count=1)
+        User.objects.update(recipes_count=0, subscribers_count=0)
+        fixed = counters.reconcile(batch_size=2)
+        self.assertEqual(fixed, {
+            'recipes.Recipe.favorites_count': 3,
+            'recipes.Recipe.in_carts_count': 3,
+            'users.CustomUser.recipes_count': 1,
+            'users.CustomUser.subscribers_count': 1,
+        })
+        self.assertEqual(
+            dict(Recipe.objects.values_list('pk', 'favorites_count')),
+            {
+                self.recipes[0].pk: 1,
+                self.recipes[1].pk: 0,
+                self.recipes[2].pk: 0,
+            }
+        )
+        self.assertEqual(
+            User.objects.get(pk=self.author.pk).recipes_count, 3
+        )
+        self.assertEqual(
+            User.objects.get(pk=self.author.pk).subscribers_count, 1
+        )
+        self.assertEqual(set(counters.reconcile().values()), {0})
+
+    def test_reconcile_given_objects(self):
+        Recipe.objects.update(favorites_count=5)
+        User.objects.update(recipes_count=0)
+        fixed = counters.reconcile(pks={
+            'recipes.Recipe': [self.recipes[1].pk],
+        })
+        self.assertEqual(fixed, {
+            'recipes.Recipe.favorites_count': 1,
+            'recipes.Recipe.in_carts_count': 0,
+        })
+        self.assertEqual(
+            dict(Recipe.objects.values_list('pk', 'favorites_count')),
+            {
+                self.recipes[0].pk: 5,
+                self.recipes[1].pk: 0,
+                self.recipes[2].pk: 5,
+            }
+        )
+        self.assertEqual(
+            User.objects.get(pk=self.author.pk).recipes_count, 0
+        )
@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from recipes import feed
+from recipes.models import Recipe, TimelineEntry
+from recipes.tests.utils import create_recipe, create_user
+from users.models import Subscription
+
+FEED_URL = '/api/recipes/feed/'
+
+
+@override_settings(FEED_FANOUT_LIMIT=1)
+class FeedTests(TestCase):
+    """
+    Reader follows author with one follower, whose recipes are fanned
+    out to timeline, and popular author with two followers, whose recipes
+    are read from recipes table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = create_user('reader')
+        cls.follower = create_user('follower')
+        cls.author = create_user('author')
+        cls.popular = create_user('popular')
+        cls.stranger = create_user('stranger')
+        now = timezone.now()
+        cls.recipes = []
+        for hours, author in (
+            (1, cls.author),
+            (2, cls.popular),
+            (2, cls.author),
+            (3, cls.popular),
+            (4, cls.popular),
+            (5, cls.author),
+            (5, cls.popular),
+            (6, cls.author),
+        ):
+            cls.recipes.append(create_recipe(
+                author, pub_date=now - timedelta(hours=hours)
+            ))
+        create_recipe(cls.stranger, pub_date=now)
+        # Popular author recipes stay in reader timeline from the time
+        # the author had one follower.
+        for user, author in (
+            (cls.reader, cls.author),
+            (cls.reader, cls.popular),
+            (cls.follower, cls.popular),
+        ):
+            with cls.captureOnCommitCallbacks(execute=True):
+                Subscription.objects.create(user=user, subscription=author)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def expected(self):
+        return [
+            recipe.pk for recipe in sorted(
+                self.recipes,
+                key=lambda recipe: (recipe.pub_date, recipe.pk),
+                reverse=True
+            )
+        ]
+
+    def read_feed(self, limit):
+        pks = []
+        url = f'{FEED_URL}?limit={limit}'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), limit)
+            pks.extend(recipe['id'] for recipe in response.data['results'])
+            url = response.data['next']
+        return pks
+
+    def test_follow_fills_timeline(self):
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(
+                user=self.reader
+            ).values_list('author', flat=True)),
+            {self.author.pk, self.popular.pk}
+        )
+
+    def test_merge_order(self):
+        page = feed.feed(Recipe.objects.all(), self.reader).page(None, 100)
+        self.assertEqual([recipe.pk for recipe in page], self.expected())
+
+    def test_pages(self):
+        for limit in (1, 2, 3, 100):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.read_feed(limit), self.expected())
+
+    def test_fanout(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = create_recipe(self.author)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, recipe=recipe
+        ).exists())
+        self.assertEqual(self.read_feed(100)[0], recipe.pk)
+
+    def test_popular_author_not_fanned_out(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = create_recipe(self.popular)
+        self.assertFalse(
+            TimelineEntry.objects.filter(recipe=recipe).exists()
+        )
+        self.assertEqual(self.read_feed(100)[0], recipe.pk)
+
+    def test_unfollow(self):
+        for author in (self.author, self.popular):
+            Subscription.objects.get(
+                user=self.reader, subscription=author
+            ).delete()
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.reader).exists()
+        )
+        self.assertEqual(self.read_feed(100), [])
+
+    def test_invalid_cursor(self):
+        for cursor in ('invalid', 'WzFd', 'WyJ4IiwgIngiXQ=='):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(FEED_URL, {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+    def test_anonymous(self):
+        self.assertEqual(APIClient().get(FEED_URL).status_code, 401)
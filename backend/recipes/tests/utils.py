@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+
+User = get_user_model()
+
+IMAGE = 'recipes/images/test.png'
+
+
+def create_user(name):
+    return User.objects.create_user(
+        username=name,
+        email=f'{name}@example.com',
+        password='password',
+        first_name=name.capitalize(),
+        last_name=name.capitalize(),
+    )
+
+
+def create_tag(slug):
+    return Tag.objects.create(name=slug, color='#FFFFFF', slug=slug)
+
+
+def create_ingredient(name, measurement_unit='г'):
+    return Ingredient.objects.create(
+        name=name, measurement_unit=measurement_unit
+    )
+
+
+def create_recipe(author, name='Рецепт', text='Описание', tags=(),
+                  ingredients=(), pub_date=None, cooking_time=10):
+    """Create recipe, `pub_date` replaces automatic publication date."""
+    recipe = Recipe.objects.create(
+        author=author,
+        name=name,
+        text=text,
+        image=IMAGE,
+        cooking_time=cooking_time,
+    )
+    if pub_date is not None:
+        Recipe.objects.filter(pk=recipe.pk).update(pub_date=pub_date)
+        recipe.pub_date = pub_date
+    recipe.tags.set(tags)
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=1)
+        for ingredient in ingredients
+    )
+    return recipe
@@ -0,0 +1,86 @@
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models.functions import Greatest, Power
+from django.utils import timezone
+
+from recipes.models import Favorite, ShoppingCart, TrendingRecipe
+
+
+class EpochSeconds(models.Func):
+    """Seconds since Unix epoch of datetime expression."""
+
+    output_field = models.FloatField()
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)'
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template='((JULIANDAY(%(expressions)s) - 2440587.5) * 86400.0)',
+            **extra_context
+        )
+
+
+def decayed_weight(now, weight):
+    """Return expression of add `weight` halved every half life of age."""
+    age = Greatest(
+        models.Value(now.timestamp()) - EpochSeconds('created'),
+        models.Value(0.0)
+    )
+    return models.Value(weight) * Power(
+        models.Value(0.5),
+        age / models.Value(settings.TRENDING_HALF_LIFE_HOURS * 3600)
+    )
+
+
+def scores(now):
+    """
+    Return trending score by recipe pk.
+
+    Every favorite and cart add (with `TRENDING_CART_WEIGHT`) of the
+    last `TRENDING_WINDOW_DAYS` adds weight halved every
+    `TRENDING_HALF_LIFE_HOURS` of its age. Scores are summed by database
+    grouped by recipe, adds without date are not counted.
+    """
+    since = now - timedelta(days=settings.TRENDING_WINDOW_DAYS)
+    result = defaultdict(float)
+    for model, weight in (
+        (Favorite, 1.0),
+        (ShoppingCart, settings.TRENDING_CART_WEIGHT),
+    ):
+        for recipe_id, score in model.objects.filter(
+            created__gte=since
+        ).values(
+            'recipe_id'
+        ).annotate(
+            score=models.Sum(decayed_weight(now, weight))
+        ).values_list(
+            'recipe_id', 'score'
+        ).order_by():
+            result[recipe_id] += score
+    return result
+
+
+def update(now=None, size=None):
+    """
+    Replace trending snapshot with `size` top scored recipes.
+
+    Snapshot is swapped in one transaction, so readers see either old or
+    new list. Return number of recipes in snapshot.
+    """
+    now = now or timezone.now()
+    size = settings.TRENDING_SIZE if size is None else size
+    top = heapq.nlargest(
+        size, scores(now).items(), key=lambda item: (item[1], item[0])
+    )
+    with transaction.atomic():
+        TrendingRecipe.objects.all().delete()
+        TrendingRecipe.objects.bulk_create(
+            TrendingRecipe(recipe_id=recipe_id, rank=rank, score=score)
+            for rank, (recipe_id, score) in enumerate(top, start=1)
+        )
+    return len(top)
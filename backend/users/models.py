@@ -4,9 +4,10 @@ from django.db import models
 
 from .validators import validate_username
 from foodgram_backend import constants
+from recipes.counters import CountersMixin
 
 
-class CustomUser(AbstractUser):
+class CustomUser(CountersMixin, AbstractUser):
     """
     Custom user model.
 
@@ -15,6 +16,12 @@ class CustomUser(AbstractUser):
     * username Char(150);
     * first_name Char(150);
     * last_name Char(150).
+
+    Counters:
+    * recipes_count (Int) - number of user recipes;
+    * subscribers_count (Int) - number of user subscribers.
+
+    Counters are not written by `save()` of existing user.
     """
 
     email = models.EmailField(
@@ -30,6 +37,18 @@ class CustomUser(AbstractUser):
         max_length=constants.CHAR_FIELD_MAX_LENGTH,
         verbose_name='Фамилия',
     )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Рецептов',
+        default=0,
+        editable=False
+    )
+    subscribers_count = models.PositiveIntegerField(
+        verbose_name='Подписчиков',
+        default=0,
+        editable=False
+    )
+
+    counter_fields = ('recipes_count', 'subscribers_count')
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = (